@@ -0,0 +1,184 @@
+import math
+import time
+from puzzleState import reconstruct_path, is_solvable
+from heuristics import get_heuristic
+from astar import AStarNode
+from openList import HeapOpenList
+from searchControl import SearchCancelled
+
+CHECK_EVERY = 1024  # Expansions between deadline/stop checks
+
+
+class ARAStar:
+    """
+    Anytime Repairing A* (Likhachev et al.): a series of weighted A* searches
+    ordered by g + weight * h with a falling weight. Each search reuses the g-values,
+    parents and open list of the previous one; states whose g improved after being
+    expanded are parked in INCONS and re-opened for the next weight instead of
+    searching from scratch.
+
+    The best solution so far and its proven suboptimality bound (cost / a lower bound
+    on the optimal cost) can be read at any moment through solution, cost and bound,
+    also from another thread; stop() interrupts a running search, and so does a
+    searchControl.SearchControl passed to improve(), whose reason is kept in
+    stop_reason instead of being raised, since the best solution so far stays usable.
+    """
+    def __init__(self, initial_state, goal_state, heuristic='auto', weight=3.0, weight_step=0.5):
+        if weight < 1:
+            raise ValueError('ARA* weight must be at least 1')
+        self.goal_state = goal_state
+        self.goal_key = goal_state.to_tuple()
+        self.heuristic_func = get_heuristic(heuristic, goal_state.board)
+        self.weight = weight
+        self.weight_step = weight_step
+        self.solvable = is_solvable(initial_state.board, goal_state.board)
+
+        h_initial = self.heuristic_func(initial_state.board)
+        root = AStarNode(initial_state, 0, h_initial)
+        self.nodes = {initial_state.to_tuple(): root}  # Best known node per state
+        self.open = HeapOpenList()
+        self.open_nodes = {}  # Live open entry per state
+        self.closed = set()
+        self.incons = {}
+        self.push(root)
+
+        self.goal_node = None
+        self.bound = math.inf
+        self.expanded = 0
+        self.iterations = 0
+        self.stopped = False
+        self.stop_reason = None
+
+    @property
+    def cost(self):
+        """Cost of the best solution found so far (inf before the first)."""
+        return self.goal_node.g_cost if self.goal_node is not None else math.inf
+
+    @property
+    def solution(self):
+        """Best solution so far (a puzzleState.Solution), or None."""
+        return reconstruct_path(self.goal_node.state) if self.goal_node is not None else None
+
+    def stop(self):
+        self.stopped = True
+
+    def push(self, node):
+        self.open_nodes[node.state.to_tuple()] = node
+        self.open.push(node, node.g_cost + self.weight * node.h_cost, node.g_cost)
+
+    def improve_path(self, deadline, control=None):
+        """
+        One weighted A* pass: expand while some open state could still lead to a
+        cheaper goal under the current weight.
+        Returns:
+            False if interrupted by the deadline or stop(), True otherwise
+        """
+        weight = self.weight
+        heuristic_func = self.heuristic_func
+        nodes, open_nodes, closed, incons = self.nodes, self.open_nodes, self.closed, self.incons
+        while self.open:
+            node = self.open.pop()
+            key = node.state.to_tuple()
+            if open_nodes.get(key) is not node:
+                continue  # Stale entry
+            if self.goal_node is not None and node.g_cost + weight * node.h_cost >= self.goal_node.g_cost:
+                self.open.push(node, node.g_cost + weight * node.h_cost, node.g_cost)
+                return True
+            del open_nodes[key]
+            closed.add(key)
+            self.expanded += 1
+            if self.expanded % CHECK_EVERY == 0 and control is not None:
+                try:
+                    control.checkpoint(self.expanded, weight=weight, stored=len(nodes))
+                except SearchCancelled as exc:
+                    self.stop_reason = exc.reason
+                    self.stopped = True
+            if self.expanded % CHECK_EVERY == 0 and (
+                    self.stopped or (deadline is not None and time.perf_counter() >= deadline)):
+                open_nodes[key] = node
+                closed.discard(key)
+                self.open.push(node, node.g_cost + weight * node.h_cost, node.g_cost)
+                return False
+
+            if key == self.goal_key:
+                self.goal_node = node
+                continue
+            g_cost = node.g_cost + 1
+            for neighbor in node.state.get_neighbors():
+                neighbor_key = neighbor.to_tuple()
+                known = nodes.get(neighbor_key)
+                if known is not None and known.g_cost <= g_cost:
+                    continue
+                h_cost = known.h_cost if known is not None else heuristic_func.child(node.state, node.h_cost, neighbor)
+                child = AStarNode(neighbor, g_cost, h_cost)
+                nodes[neighbor_key] = child
+                if neighbor_key == self.goal_key and (self.goal_node is None or g_cost < self.goal_node.g_cost):
+                    self.goal_node = child
+                if neighbor_key in closed:
+                    incons[neighbor_key] = child
+                    open_nodes.pop(neighbor_key, None)
+                else:
+                    self.push(child)
+        return True
+
+    def update_bound(self):
+        """Suboptimality bound: solution cost over the smallest g + h still open or inconsistent."""
+        lower = min((node.f_cost for node in self.open_nodes.values()), default=math.inf)
+        lower = min(lower, min((node.f_cost for node in self.incons.values()), default=math.inf))
+        if self.goal_node is None:
+            return
+        cost = self.goal_node.g_cost
+        self.bound = 1.0 if lower >= cost else min(self.weight, cost / lower if lower else math.inf)
+
+    def reopen(self):
+        """Lower the weight, move INCONS into OPEN and re-key OPEN for the new weight."""
+        self.weight = max(1.0, self.weight - self.weight_step)
+        live = list(self.open_nodes.values()) + list(self.incons.values())
+        self.open = HeapOpenList()
+        self.open_nodes = {}
+        self.incons = {}
+        self.closed = set()
+        for node in live:
+            self.push(node)
+
+    def improve(self, time_budget=None, control=None):
+        """
+        Generator: run weighted passes with a falling weight, yielding
+        (solution_path, cost, bound) after each pass that finished in time.
+        Ends once the solution is proven optimal, the time budget (seconds)
+        runs out, stop() is called or control stops the search.
+        """
+        if not self.solvable:
+            return
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        while True:
+            if not self.improve_path(deadline, control):
+                return
+            self.iterations += 1
+            self.update_bound()
+            if self.goal_node is None:
+                return  # Open list exhausted: no path
+            yield self.solution, self.cost, self.bound
+            if self.bound <= 1.0 or self.stopped:
+                return
+            self.reopen()
+
+
+def arastar(initial_state, goal_state, heuristic='auto', weight=3.0, time_budget=None, weight_step=0.5):
+    """
+    Anytime weighted A* with a wall-clock budget.
+    Args:
+        initial_state: PuzzleState/PackedState representing the start
+        goal_state: PuzzleState/PackedState representing the goal
+        heuristic: any heuristics.py option or object
+        weight: starting weight on h (>= 1); the first solution costs at most weight * optimal
+        time_budget: seconds to keep tightening the solution (None runs until optimal)
+        weight_step: weight decrease between passes
+    Returns:
+        (solution_path, cost, bound) with the best solution found in time, or
+        (None, inf, inf) if none was
+    """
+    search = ARAStar(initial_state, goal_state, heuristic, weight, weight_step)
+    for _ in search.improve(time_budget):
+        pass
+    return search.solution, search.cost, search.bound
@@ -1,57 +1,17 @@
-import heapq
 import copy
-from puzzleState import PuzzleState, reconstruct_path
-import math
-
-def manhattan_distance(board, goal_board):
-    """
-    Manhattan distance heuristic = Sum of absolute differences in x and y coordinates.
-    """
-    distance = 0
-    size = len(board)
-    
-    # Create a mapping of values to goal positions
-    goal_positions = {}
-    for i in range(size):
-        for j in range(size):
-            goal_positions[goal_board[i][j]] = (i, j)
-    
-    # Calculate Manhattan distance for each tile (except blank/0)
-    for i in range(size):
-        for j in range(size):
-            value = board[i][j]
-            if value != 0:  # Skip blank tile
-                goal_i, goal_j = goal_positions[value]
-                distance += abs(i - goal_i) + abs(j - goal_j)
-    
-    return distance
-
-def euclidean_distance(board, goal_board):
-    """
-    Calculate Euclidean distance heuristic = Straight-line distance between current and goal positions.
-    """
-    distance = 0.0
-    size = len(board)
-    
-    # Create a mapping of values to goal positions
-    goal_positions = {}
-    for i in range(size):
-        for j in range(size):
-            goal_positions[goal_board[i][j]] = (i, j)
-    
-    # Calculate Euclidean distance for each tile (except blank/0)
-    for i in range(size):
-        for j in range(size):
-            value = board[i][j]
-            if value != 0:  # Skip blank tile
-                goal_i, goal_j = goal_positions[value]
-                distance += math.sqrt((i - goal_i)**2 + (j - goal_j)**2)
-    
-    return distance
-
+from puzzleState import PuzzleState, reconstruct_path, is_solvable, UNSOLVABLE_MESSAGE
+from heuristics import manhattan_distance, euclidean_distance, get_heuristic
+from oracle import get_oracle, MAX_CELLS as ORACLE_MAX_CELLS
+from traceSink import make_trace
+from expandedLog import expanded_recorder
+from openList import make_open_list
+from time import perf_counter
+from searchControl import CHECK_MASK
 
 class AStarNode:
     """Node for A* search with f(n) = g(n) + h(n)"""
+    __slots__ = ('state', 'g_cost', 'h_cost', 'f_cost')
+
     def __init__(self, state, g_cost, h_cost):
         self.state = state
         self.g_cost = g_cost  # Cost from start to current node
@@ -69,9 +29,13 @@ class AStarNode:
 def calculate_true_distance(state, goal_state):
     """
     Calculate the true minimum distance (optimal solution length) from state to goal.
-    Uses BFS to find the shortest path.
+    Boards of up to 9 cells use the precomputed distance oracle; larger ones fall back to BFS.
     """
     from collections import deque
+
+    goal_board = goal_state.board
+    if len(goal_board) * len(goal_board[0]) <= ORACLE_MAX_CELLS:
+        return get_oracle(goal_board).distance(state)
     
     if state == goal_state:
         return 0
@@ -94,132 +58,197 @@ def calculate_true_distance(state, goal_state):
     
     return float('inf')  # No path exists
 
-def astar(initial_state, goal_state, heuristic='manhattan', trace=True):
+def astar(initial_state, goal_state, heuristic='manhattan', trace=True, debug=False, expanded=True,
+          open_list=None, stats=None, control=None):
     """
     Perform A* search on the 8-puzzle problem with state-hashing.
 
     Args:
         initial_state: PuzzleState object representing the start
         goal_state: PuzzleState object representing the goal
-        heuristic: 'manhattan' or 'euclidean'
-        trace: Include detailed intermediate logs if True
+        heuristic: 'manhattan', 'euclidean', 'pdb' or a heuristic object from heuristics.py
+        trace: trace sink option (see traceSink.make_trace); True includes detailed intermediate logs
+        debug: Cross-check every incremental heuristic update against the full recompute
+        expanded: True keeps a deep copy of every expanded board, False none;
+            a writer such as expandedLog.ExpandedLogWriter streams them instead
+        open_list: 'bucket' (f/g bucket queue), 'heap', or None for buckets with integer
+            heuristics and the heap otherwise (see openList.py)
+        stats: optional solverStats.SolverStats to fill with counters and sampled phase
+            times; reopened counts open states re-pushed with a smaller g
+        control: optional searchControl.SearchControl checked every CHECK_MASK + 1 expansions
 
     Returns:
-        (solution_path, trace_data, expanded_nodes, max_depth, heuristic_name)
+        (solution_path, trace_data, expanded_nodes, max_depth, heuristic_name),
+        or only solution_path when trace is None/False
     """
-    # Choose heuristic
-    heuristic_func = manhattan_distance if heuristic == 'manhattan' else euclidean_distance
-    heuristic_name = "Manhattan_Distance" if heuristic == 'manhattan' else "Euclidean_Distance"
+    # Choose heuristic (tables are precomputed once per goal)
+    heuristic_func = get_heuristic(heuristic, goal_state.board, debug)
+    heuristic_name = heuristic_func.name
 
     # Initial setup
-    h_initial = heuristic_func(initial_state.board, goal_state.board)
+    h_initial = heuristic_func(initial_state.board)
     initial_node = AStarNode(initial_state, 0, h_initial)
-    frontier = [initial_node]
-    frontier_dict = {initial_state.to_tuple(): initial_node}
-    heapq.heapify(frontier)
+    frontier = make_open_list(open_list, heuristic_func.integer)
+    frontier.push(initial_node, h_initial, 0)
+    frontier_dict = {initial_state.to_tuple(): initial_node}  # Live entry per state
 
     explored = set()  # {state_tuple}
-    trace_data = []
-    expanded_nodes = []
-    max_depth = 0
-    step = 0
+    tracer = make_trace(trace)
+    try:
+        detailed, counting = tracer.detailed, tracer.counting
+        expanded_nodes, record_expanded = expanded_recorder(expanded)
+        max_depth = 0
+        step = 0
 
-    if trace:
-        trace_data.append({
-            'step': 0,
-            'action': 'initialize',
-            'current_state': copy.deepcopy(initial_state.board),
-            'message': f'Starting A* with {heuristic_name}',
-            'g_cost': 0, 'h_cost': h_initial, 'f_cost': h_initial,
-            'frontier_size': 1, 'explored_size': 0
-        })
+        if not is_solvable(initial_state.board, goal_state.board):
+            if detailed:
+                tracer.emit({'step': 1, 'action': 'failed', 'message': UNSOLVABLE_MESSAGE})
+            elif counting:
+                tracer.count('failed')
+            if trace:
+                return None, tracer.data, expanded_nodes, max_depth, heuristic_name
+            return None
 
-    while frontier:
-        step += 1
-        current_node = heapq.heappop(frontier)
-        state = current_node.state
-        state_tuple = state.to_tuple()
+        if detailed:
+            tracer.emit({
+                'step': 0,
+                'action': 'initialize',
+                'current_state': copy.deepcopy(initial_state.board),
+                'message': f'Starting A* with {heuristic_name}',
+                'g_cost': 0, 'h_cost': h_initial, 'f_cost': h_initial,
+                'frontier_size': 1, 'explored_size': 0
+            })
+        elif counting:
+            tracer.count('initialize')
 
-        # Track expanded node & update depth
-        expanded_nodes.append(copy.deepcopy(state.board))
-        max_depth = max(max_depth, state.depth)
-        frontier_dict.pop(state_tuple, None)
-        explored.add(state_tuple)
+        while frontier:
+            timing = stats is not None and stats.sample()
+            if timing:
+                clock = perf_counter()
+            current_node = frontier.pop()
+            state = current_node.state
+            state_tuple = state.to_tuple()
+            if timing:
+                stats.lap('open_list', clock)
+            if stats is not None:
+                stats.pops += 1
+            if frontier_dict.get(state_tuple) is not current_node:
+                continue  # Stale entry superseded by a cheaper route
+            step += 1
+            if control is not None and not step & CHECK_MASK:
+                control.checkpoint(step, f_bound=current_node.f_cost, depth=state.depth,
+                                   stored=len(explored) + len(frontier))
 
-        if trace:
-            trace_data.append({
-                'step': step,
-                'action': 'dequeue',
-                'current_state': copy.deepcopy(state.board),
-                'g_cost': current_node.g_cost,
-                'h_cost': current_node.h_cost,
-                'f_cost': current_node.f_cost,
-                'depth': state.depth,
-                'frontier_size': len(frontier),
-                'explored_size': len(explored),
-                'message': f"Dequeued node with f={current_node.f_cost:.2f}"
-            })
+            # Track expanded node & update depth
+            if record_expanded is not None:
+                record_expanded(state)
+            max_depth = max(max_depth, state.depth)
+            del frontier_dict[state_tuple]
+            explored.add(state_tuple)
 
-        # Goal test
-        if state == goal_state:
-            solution_path = reconstruct_path(state)
-            if trace:
-                trace_data.append({
-                    'step': step + 1,
-                    'action': 'goal_found',
+            if detailed:
+                tracer.emit({
+                    'step': step,
+                    'action': 'dequeue',
                     'current_state': copy.deepcopy(state.board),
-                    'total_cost': current_node.g_cost,
-                    'message': 'Goal reached!'
+                    'g_cost': current_node.g_cost,
+                    'h_cost': current_node.h_cost,
+                    'f_cost': current_node.f_cost,
+                    'depth': state.depth,
+                    'frontier_size': len(frontier_dict),
+                    'explored_size': len(explored),
+                    'message': f"Dequeued node with f={current_node.f_cost:.2f}"
                 })
-                return solution_path, trace_data, expanded_nodes, max_depth, heuristic_name
-            return solution_path
+            elif counting:
+                tracer.count('dequeue')
 
-        # Expand neighbors
-        neighbors = state.get_neighbors()
-        added_count, updated_count = 0, 0
-        
-        for neighbor in neighbors:
-            neighbor_tuple = neighbor.to_tuple()
-            if neighbor_tuple in explored:
-                continue
+            # Goal test
+            if state == goal_state:
+                solution_path = reconstruct_path(state)
+                if detailed:
+                    tracer.emit({
+                        'step': step + 1,
+                        'action': 'goal_found',
+                        'current_state': copy.deepcopy(state.board),
+                        'total_cost': current_node.g_cost,
+                        'message': 'Goal reached!'
+                    })
+                elif counting:
+                    tracer.count('goal_found')
+                if trace:
+                    return solution_path, tracer.data, expanded_nodes, max_depth, heuristic_name
+                return solution_path
 
-            # Calculate costs
-            g_cost = current_node.g_cost + 1
-            h_cost = heuristic_func(neighbor.board, goal_state.board)
-            neighbor_node = AStarNode(neighbor, g_cost, h_cost)
+            # Expand neighbors
+            if timing:
+                clock = perf_counter()
+            neighbors = state.get_neighbors()
+            if timing:
+                clock = stats.lap('neighbors', clock)
+            added_count, updated_count = 0, 0
+            
+            for neighbor in neighbors:
+                neighbor_tuple = neighbor.to_tuple()
+                if neighbor_tuple in explored:
+                    if timing:
+                        clock = stats.lap('hashing', clock)
+                    continue
 
-            if neighbor_tuple not in frontier_dict:
-                heapq.heappush(frontier, neighbor_node)
-                frontier_dict[neighbor_tuple] = neighbor_node
-                added_count += 1
-            else:
-                existing_node = frontier_dict[neighbor_tuple]
-                if g_cost < existing_node.g_cost:
-                    # Update costs and parent for a better route
-                    existing_node.g_cost = g_cost
-                    existing_node.h_cost = h_cost
-                    existing_node.f_cost = g_cost + h_cost
-                    existing_node.state.parent = state
-                    existing_node.state.move = neighbor.move
-                    existing_node.state.depth = state.depth + 1
-                    heapq.heapify(frontier)
+                # Calculate costs
+                g_cost = current_node.g_cost + 1
+                if timing:
+                    clock = stats.lap('hashing', clock)
+                h_cost = heuristic_func.child(state, current_node.h_cost, neighbor)
+                if timing:
+                    clock = stats.lap('heuristic', clock)
+                neighbor_node = AStarNode(neighbor, g_cost, h_cost)
+
+                existing_node = frontier_dict.get(neighbor_tuple)
+                if existing_node is None:
+                    added_count += 1
+                elif g_cost < existing_node.g_cost:
+                    # Better route: push the new entry; the old one is skipped when popped
                     updated_count += 1
+                else:
+                    if timing:
+                        clock = stats.lap('hashing', clock)
+                    continue
+                frontier.push(neighbor_node, neighbor_node.f_cost, g_cost)
+                frontier_dict[neighbor_tuple] = neighbor_node
+                if timing:
+                    clock = stats.lap('open_list', clock)
 
-        if trace and (added_count or updated_count):
-            trace_data.append({
-                'step': step,
-                'action': 'expand',
-                'added_neighbors': added_count,
-                'updated_neighbors': updated_count,
-                'frontier_size': len(frontier),
-                'explored_size': len(explored),
-                'message': f'Expanded {added_count} added, {updated_count} updated nodes'
-            })
+            if stats is not None:
+                stats.expanded += 1
+                stats.generated += len(neighbors)
+                stats.duplicates += len(neighbors) - added_count - updated_count
+                stats.reopened += updated_count
+                stats.pushes += added_count + updated_count
+                stats.frontier(len(frontier_dict))
 
-    if trace:
-        trace_data.append({'step': step + 1, 'action': 'failed', 'message': 'No solution exists'})
-        return None, trace_data, expanded_nodes, max_depth, heuristic_name
-    return None
+            if detailed and (added_count or updated_count):
+                tracer.emit({
+                    'step': step,
+                    'action': 'expand',
+                    'added_neighbors': added_count,
+                    'updated_neighbors': updated_count,
+                    'frontier_size': len(frontier_dict),
+                    'explored_size': len(explored),
+                    'message': f'Expanded {added_count} added, {updated_count} updated nodes'
+                })
+            elif counting and (added_count or updated_count):
+                tracer.count('expand')
+
+        if detailed:
+            tracer.emit({'step': step + 1, 'action': 'failed', 'message': 'No solution exists'})
+        elif counting:
+            tracer.count('failed')
+        if trace:
+            return None, tracer.data, expanded_nodes, max_depth, heuristic_name
+        return None
+    finally:
+        if tracer is not trace:
+            tracer.close()
 
 
 def print_astar_solution(solution, trace, heuristic_name):
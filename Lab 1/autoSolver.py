@@ -0,0 +1,165 @@
+import math
+import time
+from puzzleState import is_solvable
+from heuristics import get_heuristic
+from batch import run_solver
+from arastar import ARAStar
+from searchControl import SearchControl, SearchCancelled, NODE_BYTES
+
+# Cost model, fitted on random 4x4 instances in this tree (CPython, additive PDB):
+# the optimal length is about (1 + GAP_RATIO) * h, and IDA* expands about
+# IDA_OVERHEAD * BRANCHING ** (optimal - h) nodes. BRANCHING is the sliding puzzle's
+# asymptotic branching factor with the parent move pruned. The fit is good to about
+# an order of magnitude, which is enough to tell feasible budgets from hopeless ones.
+BRANCHING = 2.13
+GAP_RATIO = 0.35
+IDA_OVERHEAD = 30
+ASTAR_SHARE = 0.1  # A* expansions as a fraction of IDA*'s (no transpositions or repeated iterations)
+STORED_PER_EXPANSION = 2  # A* explored plus frontier states per expansion
+RATES = {'astar': 30000, 'idastar': 80000}  # Expansions per second
+FALLBACK_SHARE = 0.2  # Share of a time budget kept for ARA* when optimal engines run first
+ARA_WEIGHT = 3.0
+MAX_EXPANDED = 1e30  # Far beyond any budget; keeps predictions finite for huge boards
+
+
+def estimate(initial_state, goal_state, heuristic='auto'):
+    """
+    Cheap difficulty estimate: board size, solvability and the initial value of
+    the heuristic (a lower bound on the solution length).
+    Returns:
+        dict with 'cells', 'solvable', 'heuristic' and 'h' (None when unsolvable)
+    """
+    goal_board = goal_state.board
+    heuristic_func = get_heuristic(heuristic, goal_board)
+    solvable = is_solvable(initial_state.board, goal_board)
+    return {
+        'cells': len(goal_board) * len(goal_board[0]),
+        'solvable': solvable,
+        'heuristic': heuristic_func.name,
+        'h': heuristic_func(initial_state.board) if solvable else None,
+    }
+
+
+def predict(difficulty):
+    """
+    Expected expansions, seconds and A* memory (bytes) of the optimal engines.
+    Returns:
+        {'astar': {...}, 'idastar': {...}} with 'expanded', 'time' and 'memory'
+    """
+    # In log space: BRANCHING ** (GAP_RATIO * h) overflows a float once h passes ~2700
+    log_expanded = min(math.log(IDA_OVERHEAD) + GAP_RATIO * difficulty['h'] * math.log(BRANCHING),
+                       math.lgamma(difficulty['cells'] + 1) - math.log(2),  # Reachable states
+                       math.log(MAX_EXPANDED))
+    expanded = math.exp(log_expanded)
+    predictions = {}
+    for engine, share in (('astar', ASTAR_SHARE), ('idastar', 1)):
+        count = max(1, expanded * share)
+        predictions[engine] = {
+            'expanded': int(count),
+            'time': count / RATES[engine],
+            'memory': int(count * STORED_PER_EXPANSION * NODE_BYTES) if engine == 'astar' else 0,
+        }
+    return predictions
+
+
+def choose_plan(difficulty, time_budget=None, memory_cap=None):
+    """
+    Engines to run in order, from the difficulty estimate and the budgets.
+    A* leads when it is expected to fit both the time and the memory budget,
+    IDA* (memory O(depth)) follows when it is expected to finish in time. With a
+    time budget, ARA* closes the plan: it returns a first, possibly suboptimal,
+    solution quickly and improves it while time is left.
+    """
+    if not difficulty['solvable']:
+        return []
+    predictions = predict(difficulty)
+    plan = []
+    astar = predictions['astar']
+    if ((time_budget is None or astar['time'] <= time_budget)
+            and (memory_cap is None or astar['memory'] <= memory_cap)):
+        plan.append('astar')
+    if time_budget is None or predictions['idastar']['time'] <= time_budget:
+        plan.append('idastar')
+    if time_budget is not None:
+        plan.append('arastar')
+    return plan
+
+
+def auto_solve(initial_state, goal_state, heuristic='auto', time_budget=None, memory_cap=512 << 20,
+               progress=None):
+    """
+    Pick engines from a difficulty estimate and run them under a time budget and a
+    memory cap. A* and ARA* are stopped once their stored states times
+    searchControl.NODE_BYTES reach memory_cap; this estimates their memory from the
+    state count rather than measuring the process. A* stopped that way hands over
+    to IDA*. When optimal engines run first under a time budget they get all but
+    FALLBACK_SHARE of it, and ARA* uses the rest if they do not finish.
+
+    Args:
+        initial_state: PuzzleState/PackedState representing the start
+        goal_state: PuzzleState/PackedState representing the goal
+        heuristic: any heuristics.py option or object
+        time_budget: seconds for the whole solve (None: unlimited, optimal engines only)
+        memory_cap: bytes A* and ARA* may use by that estimate
+        progress: optional callable receiving progress dicts with an 'engine' key
+    Returns:
+        (solution, report) where solution is a puzzleState.Solution or None and report
+        holds 'estimate', 'prediction', 'plan', 'engine', 'fallbacks', 'status',
+        'optimal', 'bound' (cost over a lower bound on the optimum), 'stopped' (why
+        ARA* ended before proving its solution optimal), 'expanded' and 'time'
+    """
+    started = time.monotonic()
+    heuristic_func = get_heuristic(heuristic, goal_state.board)
+    difficulty = estimate(initial_state, goal_state, heuristic_func)
+    plan = choose_plan(difficulty, time_budget, memory_cap)
+    report = {'estimate': difficulty, 'prediction': predict(difficulty) if plan else None, 'plan': plan,
+              'engine': None, 'fallbacks': [], 'status': 'unsolvable' if not plan else None,
+              'optimal': False, 'bound': None, 'stopped': None, 'expanded': 0}
+    solution = None
+    deadline = started + time_budget if time_budget is not None else None
+    out_of_time = False  # An optimal engine hit its deadline; the others would too
+
+    for index, engine in enumerate(plan):
+        if out_of_time and engine != 'arastar':
+            continue
+        report['engine'] = engine
+        report_progress = None
+        if progress is not None:
+            report_progress = lambda position, engine=engine: progress(dict(position, engine=engine))
+        if engine == 'arastar':
+            control = SearchControl(deadline=deadline, progress=report_progress, memory_cap=memory_cap)
+            search = ARAStar(initial_state, goal_state, heuristic_func, ARA_WEIGHT)
+            for _ in search.improve(control=control):
+                pass
+            solution = search.solution
+            report['expanded'] += search.expanded
+            report['bound'] = search.bound if solution is not None else None
+            report['optimal'] = search.bound <= 1.0
+            report['stopped'] = search.stop_reason
+            report['status'] = 'solved' if solution is not None else search.stop_reason or 'unsolved'
+            break
+
+        last = index == len(plan) - 1
+        stage_deadline = deadline
+        if deadline is not None and plan[-1] == 'arastar':
+            stage_deadline = started + time_budget * (1 - FALLBACK_SHARE)
+        control = SearchControl(deadline=stage_deadline, progress=report_progress,
+                                memory_cap=memory_cap if engine == 'astar' and not last else None)
+        try:
+            solution, expanded = run_solver(engine, initial_state, goal_state, heuristic_func, control)
+        except SearchCancelled as exc:
+            report['expanded'] += exc.expanded
+            if not last and exc.reason in ('memory', 'deadline'):
+                report['fallbacks'].append({'engine': engine, 'reason': exc.reason, 'expanded': exc.expanded})
+                out_of_time = exc.reason == 'deadline'
+                continue
+            report['status'] = exc.reason
+            break
+        report['expanded'] += expanded
+        report['status'] = 'solved' if solution is not None else 'unsolved'
+        report['optimal'] = solution is not None
+        report['bound'] = 1.0 if solution is not None else None
+        break
+
+    report['time'] = time.monotonic() - started
+    return solution, report
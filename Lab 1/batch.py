@@ -0,0 +1,251 @@
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from packedState import PackedState
+from heuristics import get_heuristic
+from expandedLog import ExpansionCounter
+from bfs import BFS, bidirectional_BFS
+from dfs import DFS
+from iddfs import IDDFS
+from astar import astar
+from idastar import IDAstar
+from beamSearch import greedy_best_first, beam_search
+from oracle import get_oracle, oracle_solve
+from numpyBatch import batch_BFS, batch_astar
+from puzzleState import path_from_moves
+from solutionCache import SolutionCache, OPTIMAL_ALGORITHMS, canonical_key
+from main import parse_shape, parse_state
+
+ALGORITHMS = ('bfs', 'dfs', 'iddfs', 'astar', 'idastar', 'bidirectional', 'oracle', 'greedy', 'beam',
+              'numpy_bfs', 'numpy_astar')
+
+
+class SolveTimeout(Exception):
+    pass
+
+
+# Per-worker state, filled once by init_worker and reused for every task
+_worker = {}
+
+
+def init_worker(algorithm, heuristic, goal_board, timeout):
+    """Load the goal and any heuristic tables once per worker process."""
+    _worker['algorithm'] = algorithm
+    _worker['goal'] = PackedState.from_board(goal_board)
+    _worker['timeout'] = timeout
+    if algorithm in ('astar', 'idastar', 'greedy', 'beam'):
+        _worker['heuristic'] = get_heuristic(heuristic, goal_board)
+    elif algorithm == 'numpy_astar':
+        _worker['heuristic'] = heuristic  # Resolved to a vectorised table by batch_astar
+    elif algorithm == 'oracle':
+        get_oracle(goal_board)
+
+
+def _raise_timeout(signum, frame):
+    raise SolveTimeout()
+
+
+def run_solver(algorithm, initial, goal, heuristic=None, control=None):
+    """
+    Run one solver without traces. control (a searchControl.SearchControl) is
+    honoured by bfs, dfs, iddfs, astar and idastar.
+    Returns:
+        (solution_path, expanded_count)
+    """
+    counter = ExpansionCounter()
+    if algorithm == 'bfs':
+        solution = BFS(initial, goal, trace=None, expanded=counter, control=control)[0]
+    elif algorithm == 'dfs':
+        solution = DFS(initial, goal, trace=None, expanded=counter, control=control)[0]
+    elif algorithm == 'iddfs':
+        solution = IDDFS(initial, goal, trace=None, expanded=counter, control=control)[0]
+    elif algorithm == 'astar':
+        solution = astar(initial, goal, heuristic, trace=None, expanded=counter, control=control)
+    elif algorithm == 'idastar':
+        solution = IDAstar(initial, goal, heuristic, trace=None, expanded=counter, control=control)[0]
+    elif algorithm == 'bidirectional':
+        solution = bidirectional_BFS(initial, goal, trace=None, expanded=counter)[0]
+    elif algorithm == 'greedy':
+        solution = greedy_best_first(initial, goal, heuristic, expanded=counter)[0]
+    elif algorithm == 'beam':
+        solution = beam_search(initial, goal, heuristic, expanded=counter)[0]
+    elif algorithm == 'numpy_bfs':
+        solution, layer_counts = batch_BFS(initial, goal)
+        return solution, sum(layer_counts[:-1])  # Every layer before the goal's was expanded
+    elif algorithm == 'numpy_astar':
+        solution, stats = batch_astar(initial, goal, heuristic or 'auto')
+        return solution, stats['expanded']
+    else:
+        solution = oracle_solve(initial, goal)[0]
+    return solution, len(counter)
+
+
+def solve_task(index, line, board):
+    """Solve one instance inside a worker, enforcing the per-instance timeout."""
+    result = {'index': index, 'state': line}
+    timeout = _worker['timeout']
+    if timeout:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = time.perf_counter()
+    try:
+        initial = PackedState.from_board(board)
+        solution, expanded = run_solver(_worker['algorithm'], initial, _worker['goal'], _worker.get('heuristic'))
+        if solution is None:
+            result['status'] = 'unsolved'
+        else:
+            result.update(status='solved', moves=solution.move_names(), length=len(solution) - 1)
+        result['expanded'] = expanded
+    except SolveTimeout:
+        result['status'] = 'timeout'
+    except Exception as exc:
+        result['status'] = 'error'
+        result['error'] = str(exc)
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    result['time'] = time.perf_counter() - start
+    return result
+
+
+def read_instances(stream, rows, cols=None):
+    """
+    Yield (index, line, board, error) for every non-empty, non-comment input line.
+    A line that does not parse gets board None and the parse error's message, so
+    one bad line does not end the batch.
+    """
+    index = 0
+    for raw in stream:
+        line = raw.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            board, error = parse_state(line, rows, cols), None
+        except ValueError as exc:
+            board, error = None, str(exc)
+        yield index, line, board, error
+        index += 1
+
+
+def run_batch(instances, out, algorithm='astar', heuristic='auto', goal_board=None,
+              workers=None, timeout=None, window=None, cache=False, cache_file=None):
+    """
+    Fan instances out over a process pool and write one JSON line per result,
+    in input order, as soon as each becomes the next one due.
+    At most `window` tasks are in flight so huge inputs are never fully queued.
+    With cache (or a shared SQLite cache_file) the parent process answers repeated
+    and symmetric instances from a solutionCache.SolutionCache before they reach
+    the pool, and fills it from the workers' results. An instance whose canonical
+    key is already being solved waits for that result instead of being solved twice.
+    Instances are read_instances tuples; lines that failed to parse are written as
+    'error' results.
+    Returns:
+        (results written, results answered from the cache)
+    """
+    workers = workers or os.cpu_count() or 1
+    window = window or workers * 4
+    pending = deque()  # (index, line, board, canonical key, future, cached result)
+    counts = [0, 0]
+    solution_cache = SolutionCache(path=cache_file) if cache or cache_file else None
+    goal = PackedState.from_board(goal_board)
+    optimal = algorithm in OPTIMAL_ALGORITHMS
+    in_flight = set()
+
+    def cached_result(index, line, board):
+        start = time.perf_counter()
+        solution = solution_cache.get(PackedState.from_board(board), goal, optimal)
+        if solution is None:
+            return None
+        return {'index': index, 'state': line, 'status': 'solved', 'moves': solution.move_names(),
+                'length': len(solution) - 1, 'expanded': 0, 'cached': True,
+                'time': time.perf_counter() - start}
+
+    def finish(pool, index, line, board, key, future, result):
+        if result is not None:
+            return result
+        if future is None:  # Same key as an earlier instance: its result is cached by now
+            result = cached_result(index, line, board)
+            if result is not None:
+                return result
+            future = pool.submit(solve_task, index, line, board)  # The first copy was not solved
+        result = future.result()
+        if solution_cache is not None:
+            in_flight.discard(key)
+            result['cached'] = False
+            if result['status'] == 'solved':
+                initial = PackedState.from_board(board)
+                solution_cache.put(initial, goal, path_from_moves(initial, result['moves']), optimal)
+        return result
+
+    def write(result):
+        counts[0] += 1
+        counts[1] += bool(result.get('cached'))
+        out.write(json.dumps(result) + '\n')
+        out.flush()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(algorithm, heuristic, goal_board, timeout)) as pool:
+            for index, line, board, error in instances:
+                key = future = result = None
+                if error is not None:  # Malformed line: written in order as an error result
+                    result = {'index': index, 'state': line, 'status': 'error', 'error': error}
+                elif solution_cache is not None:
+                    key = canonical_key(board, goal_board)[0]
+                    if key not in in_flight:
+                        result = cached_result(index, line, board)
+                if result is None and key not in in_flight:
+                    future = pool.submit(solve_task, index, line, board)
+                    if key is not None:
+                        in_flight.add(key)
+                pending.append((index, line, board, key, future, result))
+                if len(pending) >= window:
+                    write(finish(pool, *pending.popleft()))
+            while pending:
+                write(finish(pool, *pending.popleft()))
+    finally:
+        if solution_cache is not None:
+            solution_cache.close()
+    return tuple(counts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Solve many sliding puzzles and stream JSONL results')
+    parser.add_argument('input', nargs='?', default='-', help="file with one comma-separated state per line ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="JSONL output file ('-' for stdout)")
+    parser.add_argument('-a', '--algorithm', choices=ALGORITHMS, default='astar')
+    parser.add_argument('--heuristic', default='auto', help="heuristic for astar/idastar/greedy/beam ('auto' picks by board shape); "
+                        "numpy_astar takes manhattan or euclidean")
+    parser.add_argument('--size', type=parse_shape, default=(3, 3), help="board shape, e.g. '4' or '3x5'")
+    parser.add_argument('--goal', help='comma-separated goal (default 0,1,2,...)')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('-t', '--timeout', type=float, default=None, help='per-instance timeout in seconds')
+    parser.add_argument('--cache', action='store_true', help='reuse solutions of repeated and mirror-image instances')
+    parser.add_argument('--cache-file', help='SQLite file backing the solution cache across runs (implies --cache)')
+    args = parser.parse_args(argv)
+
+    rows, cols = args.size
+    goal_input = args.goal or ','.join(str(i) for i in range(rows * cols))
+    goal_board = parse_state(goal_input, rows, cols)
+    source = sys.stdin if args.input == '-' else open(args.input)
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        solved, cached = run_batch(read_instances(source, rows, cols), out, args.algorithm, args.heuristic,
+                                   goal_board, args.workers, args.timeout,
+                                   cache=args.cache, cache_file=args.cache_file)
+        if args.cache or args.cache_file:
+            print(f'Cache hit rate: {cached}/{solved} ({cached / solved if solved else 0:.1%})', file=sys.stderr)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
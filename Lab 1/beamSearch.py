@@ -0,0 +1,133 @@
+import heapq
+import itertools
+from puzzleState import reconstruct_path, is_solvable
+from heuristics import get_heuristic
+from expandedLog import expanded_recorder
+
+
+def greedy_best_first(initial_state, goal_state, heuristic='auto', max_frontier=1 << 20, max_seen=None,
+                      max_expanded=None, expanded=False):
+    """
+    Greedy best-first search: always expand the open state with the smallest h,
+    ignoring path cost. Fast but suboptimal. When the frontier grows past
+    max_frontier it is cut back to its best half (at the price of completeness).
+    The duplicate set is bounded too: past max_seen keys it is reset to the
+    states still in the frontier, so states expanded earlier may be generated
+    again and memory stays O(max_frontier + max_seen). With small caps the search
+    can then cycle; max_expanded bounds the work.
+
+    Args:
+        initial_state: PuzzleState/PackedState representing the start
+        goal_state: PuzzleState/PackedState representing the goal
+        heuristic: any heuristics.py option or object
+        max_frontier: frontier size that triggers pruning
+        max_seen: duplicate-set size that triggers its reset (default 4 * max_frontier)
+        max_expanded: give up after this many expansions (default: no limit)
+        expanded: False, or a writer such as expandedLog.ExpandedLogWriter that
+            receives every expanded state
+    Returns:
+        (solution_path, stats) with stats keys 'expanded', 'generated',
+        'peak_frontier', 'solution_length' and 'heuristic'
+    """
+    heuristic_func = get_heuristic(heuristic, goal_state.board)
+    _, record_expanded = expanded_recorder(expanded)
+    if max_seen is None:
+        max_seen = 4 * max_frontier
+    stats = {'expanded': 0, 'generated': 1, 'peak_frontier': 1, 'solution_length': None,
+             'heuristic': heuristic_func.name}
+    if not is_solvable(initial_state.board, goal_state.board):
+        return None, stats
+
+    goal_key = goal_state.to_tuple()
+    counter = itertools.count()  # FIFO among equal h, never compares states
+    frontier = [(heuristic_func(initial_state.board), next(counter), initial_state)]
+    seen = {initial_state.to_tuple()}
+
+    while frontier:
+        h, _, state = heapq.heappop(frontier)
+        if state.to_tuple() == goal_key:
+            solution_path = reconstruct_path(state)
+            stats['solution_length'] = len(solution_path) - 1
+            return solution_path, stats
+        if stats['expanded'] == max_expanded:
+            break
+        stats['expanded'] += 1
+        if record_expanded is not None:
+            record_expanded(state)
+
+        for neighbor in state.get_neighbors():
+            key = neighbor.to_tuple()
+            if key in seen:
+                continue
+            seen.add(key)
+            heapq.heappush(frontier, (heuristic_func.child(state, h, neighbor), next(counter), neighbor))
+            stats['generated'] += 1
+
+        if len(frontier) > stats['peak_frontier']:
+            stats['peak_frontier'] = len(frontier)
+        if len(frontier) > max_frontier:
+            frontier = heapq.nsmallest(max_frontier // 2, frontier)
+            heapq.heapify(frontier)
+        if len(seen) > max_seen:
+            seen = {entry[2].to_tuple() for entry in frontier}
+
+    return None, stats
+
+
+def beam_search(initial_state, goal_state, heuristic='auto', width=1000, max_depth=10000, expanded=False):
+    """
+    Beam search: breadth-first by depth, keeping only the `width` children with the
+    smallest h at every depth. Duplicates are dropped against the current and the
+    previous two layers only, so memory is O(width) besides the parent chains of
+    the surviving states.
+
+    Args:
+        initial_state: PuzzleState/PackedState representing the start
+        goal_state: PuzzleState/PackedState representing the goal
+        heuristic: any heuristics.py option or object
+        width: states kept per depth
+        max_depth: give up after this many layers
+        expanded: as in greedy_best_first
+    Returns:
+        (solution_path, stats) as in greedy_best_first; 'peak_frontier' counts the
+        candidates held while choosing a layer
+    """
+    heuristic_func = get_heuristic(heuristic, goal_state.board)
+    _, record_expanded = expanded_recorder(expanded)
+    stats = {'expanded': 0, 'generated': 1, 'peak_frontier': 1, 'solution_length': None,
+             'heuristic': heuristic_func.name}
+    if not is_solvable(initial_state.board, goal_state.board):
+        return None, stats
+
+    goal_key = goal_state.to_tuple()
+    if initial_state.to_tuple() == goal_key:
+        stats['solution_length'] = 0
+        return reconstruct_path(initial_state), stats
+
+    layer = [(heuristic_func(initial_state.board), initial_state)]
+    recent = [set(), {initial_state.to_tuple()}]  # Keys of the two previous layers
+
+    for _ in range(max_depth):
+        candidates = {}
+        for h, state in layer:
+            stats['expanded'] += 1
+            if record_expanded is not None:
+                record_expanded(state)
+            for neighbor in state.get_neighbors():
+                key = neighbor.to_tuple()
+                if key in candidates or key in recent[0] or key in recent[1]:
+                    continue
+                if key == goal_key:
+                    solution_path = reconstruct_path(neighbor)
+                    stats['solution_length'] = len(solution_path) - 1
+                    return solution_path, stats
+                candidates[key] = (heuristic_func.child(state, h, neighbor), neighbor)
+        stats['generated'] += len(candidates)
+        if len(candidates) > stats['peak_frontier']:
+            stats['peak_frontier'] = len(candidates)
+        if not candidates:
+            break
+        layer = heapq.nsmallest(width, candidates.values(), key=lambda item: item[0])
+        recent = [recent[1], {state.to_tuple() for _, state in layer}]
+
+    return None, stats
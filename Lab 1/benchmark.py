@@ -0,0 +1,299 @@
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from packedState import PackedState
+from heuristics import get_heuristic
+from idastar import IDAstar
+from oracle import get_oracle
+from batch import run_solver
+from hdastar import hdastar
+
+# Algorithms per suite, each with the deepest instance it is run on
+SUITES = {
+    '3x3': {
+        'rows': 3, 'cols': 3,
+        'depths': (5, 10, 15, 20, 25, 31),
+        'algorithms': {
+            'bfs': 31, 'dfs': 31, 'iddfs': 10, 'bidirectional': 31,
+            'astar:manhattan': 31, 'astar:euclidean': 31, 'astar:pdb': 31,
+            'astar:linear_conflict': 31, 'astar:walking_distance': 31,
+            'idastar:manhattan': 31, 'idastar:pdb': 31,
+            'idastar:linear_conflict': 31, 'idastar:walking_distance': 31,
+        },
+    },
+    '4x4': {
+        'rows': 4, 'cols': 4,
+        'depths': (10, 20, 30, 40),
+        'algorithms': {
+            'bidirectional': 20, 'astar:manhattan': 30, 'astar:pdb': 40,
+            'astar:linear_conflict': 30, 'astar:walking_distance': 30,
+            'idastar:manhattan': 40, 'idastar:pdb': 40,
+            'idastar:linear_conflict': 40, 'idastar:walking_distance': 40,
+        },
+    },
+}
+
+
+def goal_board(rows, cols):
+    return [[r * cols + c for c in range(cols)] for r in range(rows)]
+
+
+def to_board(tiles, cols):
+    return [list(tiles[i:i + cols]) for i in range(0, len(tiles), cols)]
+
+
+def optimal_depth(tiles, rows, cols, goal):
+    """Optimal solution length, by oracle lookup when it fits, otherwise IDA* with the PDB heuristic."""
+    if rows * cols <= 9:
+        return get_oracle(goal).tiles_distance(tiles)
+    solution = IDAstar(PackedState.from_board(to_board(tiles, cols)), PackedState.from_board(goal), 'pdb')[0]
+    return len(solution) - 1
+
+
+def generate_instances(suite, count, seed):
+    """
+    Seeded instances at exact optimal depths. Boards up to 3x3 are sampled from the
+    oracle's depth layers; larger boards come from non-backtracking random walks whose
+    optimal depth is verified with IDA*.
+    Returns:
+        list of {'id', 'depth', 'state'} with state as a flat tile list
+    """
+    spec = SUITES[suite]
+    rows, cols = spec['rows'], spec['cols']
+    goal = goal_board(rows, cols)
+    rng = random.Random(seed)
+    instances = []
+    for depth in spec['depths']:
+        if rows * cols <= 9:
+            layer = get_oracle(goal).states_at(depth)
+            chosen = rng.sample(layer, min(count, len(layer)))
+        else:
+            chosen = []
+            while len(chosen) < count:
+                state = PackedState.from_board(goal)
+                previous = None
+                for _ in range(depth + rng.randint(0, depth // 2)):
+                    options = [n for n in state.get_neighbors() if n.packed != previous]
+                    previous = state.packed
+                    state = rng.choice(options)
+                tiles = [value for row in state.board for value in row]
+                if tiles not in chosen and optimal_depth(tiles, rows, cols, goal) == depth:
+                    chosen.append(tiles)
+        for i, tiles in enumerate(chosen):
+            instances.append({'id': f'{suite}-d{depth}-{i}', 'depth': depth, 'state': tiles})
+    return instances
+
+
+def _measure(conn, algorithm, heuristic, tiles, rows, cols, memory):
+    """
+    Child-process body: time one solve, optionally re-run it under tracemalloc.
+    A forked child's ru_maxrss starts at the parent's RSS, so the peak is reported
+    as growth over the value read on entry, with that baseline alongside.
+    """
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    goal = PackedState.from_board(goal_board(rows, cols))
+    initial = PackedState.from_board(to_board(tiles, cols))
+    start = time.perf_counter()
+    solution, expanded = run_solver(algorithm, initial, goal, heuristic)
+    elapsed = time.perf_counter() - start
+    result = {
+        'status': 'solved' if solution is not None else 'unsolved',
+        'time': elapsed,
+        'expanded': expanded,
+        'nodes_per_sec': expanded / elapsed if elapsed else None,
+        'solution_length': len(solution) - 1 if solution is not None else None,
+    }
+    if memory:
+        tracemalloc.start()
+        run_solver(algorithm, initial, goal, heuristic)
+        result['tracemalloc_peak'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    result['base_rss_kb'] = base_rss
+    result['peak_rss_delta_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_rss
+    conn.send(result)
+    conn.close()
+
+
+def run_case(algorithm_spec, instance, rows, cols, timeout, memory):
+    """
+    Run one (algorithm, instance) pair in a forked process so it can be killed on
+    timeout. A child that dies without a result is recorded as status 'error' with
+    its exit code (negative: killed by that signal).
+    """
+    algorithm, _, heuristic_name = algorithm_spec.partition(':')
+    heuristic = get_heuristic(heuristic_name, goal_board(rows, cols)) if heuristic_name else None
+    context = multiprocessing.get_context('fork')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_measure, args=(sender, algorithm, heuristic, instance['state'],
+                                                     rows, cols, memory))
+    started = time.perf_counter()
+    process.start()
+    sender.close()
+    if receiver.poll(timeout):
+        try:
+            result = receiver.recv()
+        except EOFError:  # The child died without reporting (crash, OOM kill)
+            process.join()
+            return {'status': 'error', 'time': time.perf_counter() - started, 'exitcode': process.exitcode}
+    else:
+        process.kill()
+        result = {'status': 'timeout', 'time': timeout}
+    process.join()
+    return result
+
+
+def run_benchmark(suites, count, seed, timeout, memory, algorithms=None, log=sys.stderr):
+    results = []
+    for suite in suites:
+        spec = SUITES[suite]
+        instances = generate_instances(suite, count, seed)
+        for instance in instances:
+            for algorithm, max_depth in spec['algorithms'].items():
+                if instance['depth'] > max_depth or (algorithms and algorithm not in algorithms):
+                    continue
+                result = run_case(algorithm, instance, spec['rows'], spec['cols'], timeout, memory)
+                result.update(suite=suite, instance=instance['id'], depth=instance['depth'],
+                              state=instance['state'], algorithm=algorithm)
+                results.append(result)
+                print(f"{instance['id']:<14} {algorithm:<18} {result['status']:<8} "
+                      f"{result['time']:>9.3f}s {result.get('expanded', '-'):>9}", file=log)
+    return {
+        'meta': {
+            'seed': seed, 'count': count, 'suites': list(suites), 'timeout': timeout,
+            'python': platform.python_version(), 'machine': platform.machine(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def run_scaling(worker_counts, count, seed, heuristic='manhattan', min_depth=30, log=sys.stderr):
+    """
+    HDA* strong scaling on 15-puzzle instances: every instance at depth >= min_depth
+    is solved once per worker count; speedup is relative to the first count.
+    """
+    goal = PackedState.from_board(goal_board(4, 4))
+    instances = [i for i in generate_instances('4x4', count, seed) if i['depth'] >= min_depth]
+    results = []
+    for instance in instances:
+        initial = PackedState.from_board(to_board(instance['state'], 4))
+        baseline = None
+        for workers in worker_counts:
+            stats = {}
+            solution = hdastar(initial, goal, heuristic, workers, stats)
+            baseline = baseline or stats['time']
+            result = {
+                'instance': instance['id'], 'depth': instance['depth'], 'state': instance['state'],
+                'workers': workers, 'heuristic': heuristic, 'time': stats['time'],
+                'expanded': stats['expanded'], 'per_worker': stats['per_worker'],
+                'solution_length': len(solution) - 1 if solution is not None else None,
+                'speedup': baseline / stats['time'],
+            }
+            results.append(result)
+            print(f"{instance['id']:<14} {workers:>3} workers {result['time']:>9.3f}s "
+                  f"{result['expanded']:>9} expanded  speedup {result['speedup']:.2f}", file=log)
+    return {
+        'meta': {
+            'seed': seed, 'count': count, 'heuristic': heuristic, 'workers': list(worker_counts),
+            'cpus': multiprocessing.cpu_count(), 'python': platform.python_version(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, time_tolerance=0.25, min_time=0.01):
+    """
+    Diff two benchmark result files.
+    A case regresses when it stops solving, its solution gets longer, it expands
+    more nodes, or it gets slower than baseline * (1 + time_tolerance)
+    (ignored below min_time seconds, where timer noise dominates).
+    Returns:
+        list of (key, message) regressions
+    """
+    base = {(r['instance'], r['algorithm']): r for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        key = (result['instance'], result['algorithm'])
+        old = base.get(key)
+        if old is None:
+            continue
+        if old.get('state') != result.get('state'):
+            regressions.append((key, 'instance differs from baseline (different seed?)'))
+            continue
+        if old['status'] == 'solved' and result['status'] != 'solved':
+            regressions.append((key, f"status {old['status']} -> {result['status']}"))
+            continue
+        if result['status'] != 'solved':
+            continue
+        if (old.get('solution_length') is not None
+                and result['solution_length'] > old['solution_length']):
+            regressions.append((key, f"solution length {old['solution_length']} -> {result['solution_length']}"))
+        if old.get('expanded') is not None and result['expanded'] > old['expanded']:
+            regressions.append((key, f"expanded {old['expanded']} -> {result['expanded']}"))
+        if max(old['time'], result['time']) >= min_time and result['time'] > old['time'] * (1 + time_tolerance):
+            regressions.append((key, f"time {old['time']:.3f}s -> {result['time']:.3f}s"))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Reproducible solver benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='run the benchmark suites')
+    run.add_argument('--suite', action='append', choices=sorted(SUITES), help='suite(s) to run (default: 3x3)')
+    run.add_argument('--count', type=int, default=2, help='instances per depth')
+    run.add_argument('--seed', type=int, default=2024)
+    run.add_argument('--timeout', type=float, default=120.0, help='per-run timeout in seconds')
+    run.add_argument('--memory', action='store_true', help='also measure tracemalloc peak (re-runs each case)')
+    run.add_argument('--algorithm', action='append', help='restrict to these algorithm specs, e.g. astar:pdb')
+    run.add_argument('-o', '--output', default='benchmark.json')
+
+    scaling = commands.add_parser('scaling', help='HDA* scaling over worker counts on 15-puzzle instances')
+    scaling.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    scaling.add_argument('--count', type=int, default=2, help='instances per depth')
+    scaling.add_argument('--seed', type=int, default=2024)
+    scaling.add_argument('--heuristic', default='manhattan')
+    scaling.add_argument('--min-depth', type=int, default=30)
+    scaling.add_argument('-o', '--output', default='scaling.json')
+
+    diff = commands.add_parser('compare', help='flag regressions against a baseline')
+    diff.add_argument('current')
+    diff.add_argument('baseline')
+    diff.add_argument('--time-tolerance', type=float, default=0.25)
+    diff.add_argument('--min-time', type=float, default=0.01)
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        report = run_benchmark(args.suite or ['3x3'], args.count, args.seed, args.timeout,
+                               args.memory, args.algorithm)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+        print(f"Wrote {len(report['results'])} results to {args.output}")
+        return 0
+    if args.command == 'scaling':
+        report = run_scaling(args.workers, args.count, args.seed, args.heuristic, args.min_depth)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+        print(f"Wrote {len(report['results'])} results to {args.output}")
+        return 0
+
+    with open(args.current) as f:
+        current = json.load(f)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(current, baseline, args.time_tolerance, args.min_time)
+    for (instance, algorithm), message in regressions:
+        print(f'REGRESSION {instance} {algorithm}: {message}')
+    print(f'{len(regressions)} regression(s)')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,86 +1,368 @@
 from collections import deque
-from puzzleState import PuzzleState, reconstruct_path
+from puzzleState import PuzzleState, reconstruct_path, path_from_moves, is_solvable, UNSOLVABLE_MESSAGE
+from packedState import PackedState, move_table, pack_board, tile_bits
+from nodeArena import NodeArena, ArenaBoards
+from traceSink import make_trace
+from expandedLog import expanded_recorder
+from time import perf_counter
+from searchControl import CHECK_MASK
 import copy
 
-def BFS(initialState, goalState):
+INVERSE_MOVES = {'Up': 'Down', 'Down': 'Up', 'Left': 'Right', 'Right': 'Left'}
+
+def BFS(initialState, goalState, trace=True, expanded=True, stats=None, control=None):
+    """
+    Args:
+        initialState: PuzzleState object representing the start
+        goalState: PuzzleState object representing the goal
+        trace: trace sink option (see traceSink.make_trace); True keeps every event
+        expanded: True keeps a deep copy of every expanded board, False none;
+            a writer such as expandedLog.ExpandedLogWriter streams them instead
+        stats: optional solverStats.SolverStats to fill with counters and sampled phase times
+        control: optional searchControl.SearchControl checked every CHECK_MASK + 1 expansions
+
+    Returns:
+        (solution_path, trace_data, expanded_nodes, max_depth)
+    """
     frontier = deque([initialState])
     frontier_set = {initialState.to_tuple()}
     explored = set()
-    expanded_nodes = []
-    trace_data = []
-    max_depth = 0
+    expanded_nodes, record_expanded = expanded_recorder(expanded)
+    tracer = make_trace(trace)
+    try:
+        detailed, counting = tracer.detailed, tracer.counting
+        max_depth = 0
 
-    trace_data.append({
+        if not is_solvable(initialState.board, goalState.board):
+            if detailed:
+                tracer.emit({'step': 1, 'action': 'failed', 'message': UNSOLVABLE_MESSAGE})
+            elif counting:
+                tracer.count('failed')
+            return None, tracer.data, expanded_nodes, max_depth
+
+        if detailed:
+            tracer.emit({
+                'step': 0,
+                'action': 'initialize',
+                'current_state': copy.deepcopy(initialState.board),
+                'frontier_size': 1,
+                'explored_size': 0,
+                'message': 'Starting BFS with initial state'
+            })
+        elif counting:
+            tracer.count('initialize')
+        
+        step = 0
+        
+        while frontier:
+            step += 1
+            timing = stats is not None and stats.sample()
+            if timing:
+                clock = perf_counter()
+            state = frontier.popleft()
+            if timing:
+                stats.lap('open_list', clock)
+            if stats is not None:
+                stats.pops += 1
+            if control is not None and not step & CHECK_MASK:
+                control.checkpoint(step, depth=state.depth, stored=len(explored) + len(frontier))
+            state_tuple = state.to_tuple()
+
+            # Defensive removal from frontier_set
+            if state_tuple in frontier_set:
+                frontier_set.remove(state_tuple)
+
+            if record_expanded is not None:
+                record_expanded(state)
+            max_depth = max(max_depth, state.depth)
+
+            if detailed:
+                tracer.emit({
+                    'step': step,
+                    'action': 'pop',
+                    'current_state': copy.deepcopy(state.board),
+                    'depth': state.depth,
+                    'move': state.move,
+                    'frontier_size': len(frontier),
+                    'explored_size': len(explored),
+                    'message': f'Popped state (depth {state.depth})'
+                })
+            elif counting:
+                tracer.count('pop')
+
+            if state == goalState:
+                solution_path = reconstruct_path(state)
+                if detailed:
+                    tracer.emit({
+                        'step': step + 1,
+                        'action': 'goal_found',
+                        'current_state': copy.deepcopy(state.board),
+                        'solution_length': len(solution_path),
+                        'message': f'Goal found! Solution has {len(solution_path)} moves'
+                    })
+                elif counting:
+                    tracer.count('goal_found')
+                return solution_path, tracer.data, expanded_nodes, max_depth
+
+            explored.add(state.to_tuple())
+            
+            if timing:
+                clock = perf_counter()
+            neighbors = state.get_neighbors()
+            if timing:
+                clock = stats.lap('neighbors', clock)
+            added_count = 0
+
+            for neighbor in neighbors:
+                neighbor_tuple = neighbor.to_tuple()
+                
+                if neighbor_tuple not in explored and neighbor_tuple not in frontier_set:
+                    frontier.append(neighbor)
+                    frontier_set.add(neighbor_tuple)
+                    added_count += 1
+            if timing:
+                stats.lap('hashing', clock)
+            if stats is not None:
+                stats.expanded += 1
+                stats.generated += len(neighbors)
+                stats.duplicates += len(neighbors) - added_count
+                stats.pushes += added_count
+                stats.frontier(len(frontier))
+
+            if added_count > 0:
+                if detailed:
+                    tracer.emit({
+                        'step': step,
+                        'action': 'expand',
+                        'added_neighbors': added_count,
+                        'frontier_size': len(frontier),
+                        'explored_size': len(explored),
+                        'message': f'Added {added_count} new neighbors to frontier'
+                    })
+                elif counting:
+                    tracer.count('expand')
+
+        if detailed:
+            tracer.emit({
+                'step': step + 1,
+                'action': 'failed',
+                'message': 'Goal not found - no solution exists'
+            })
+        elif counting:
+            tracer.count('failed')
+        return None, tracer.data, expanded_nodes, max_depth
+    finally:
+        if tracer is not trace:
+            tracer.close()
+
+
+def compact_BFS(initialState, goalState):
+    """
+    BFS over a NodeArena instead of PuzzleState parent chains.
+    Nodes are appended to the arena in FIFO order, so the frontier is simply the
+    arena tail [head, len(arena)) and the expanded nodes are its prefix.
+
+    Returns:
+        (solution_path, trace_data, expanded_nodes, max_depth) like BFS, with
+        expanded_nodes as a lazy ArenaBoards view and a summary-only trace
+    """
+    board = initialState.board
+    rows, cols = len(board), len(board[0])
+    start, blank = pack_board(board)
+    goal, _ = pack_board(goalState.board)
+
+    arena = NodeArena(rows, cols)
+    arena.add(start, blank)
+    seen = {start}
+    table = move_table(rows, cols)
+    mask = (1 << tile_bits(rows, cols)) - 1
+    packed_states, blanks, g_costs = arena.packed, arena.blank, arena.g_cost
+
+    trace_data = [{
         'step': 0,
         'action': 'initialize',
-        'current_state': copy.deepcopy(initialState.board),
+        'current_state': copy.deepcopy(board),
         'frontier_size': 1,
         'explored_size': 0,
-        'message': 'Starting BFS with initial state'
-    })
-    
-    step = 0
-    
-    while frontier:
-        step += 1
-        state = frontier.popleft()
-        state_tuple = state.to_tuple()
-
-        # Defensive removal from frontier_set
-        if state_tuple in frontier_set:
-            frontier_set.remove(state_tuple)
-
-        expanded_nodes.append(copy.deepcopy(state.board))
-        max_depth = max(max_depth, state.depth)
-
-        trace_data.append({
-            'step': step,
-            'action': 'pop',
-            'current_state': copy.deepcopy(state.board),
-            'depth': state.depth,
-            'move': state.move,
-            'frontier_size': len(frontier),
-            'explored_size': len(explored),
-            'message': f'Popped state (depth {state.depth})'
-        })
-
-        if state == goalState:
-            solution_path = reconstruct_path(state)
+        'message': 'Starting compact BFS with initial state'
+    }]
+    if not is_solvable(board, goalState.board):
+        trace_data.append({'step': 1, 'action': 'failed', 'message': UNSOLVABLE_MESSAGE})
+        return None, trace_data, ArenaBoards(arena, 0, 0), 0
+
+    head = 0
+    while head < len(arena):
+        packed = packed_states[head]
+
+        if packed == goal:
+            solution_path = arena.reconstruct_path(head)
             trace_data.append({
-                'step': step + 1,
+                'step': head + 1,
+                'action': 'pop',
+                'current_state': arena.board(head),
+                'depth': g_costs[head],
+                'frontier_size': len(arena) - head - 1,
+                'explored_size': head,
+                'message': f'Popped state (depth {g_costs[head]})'
+            })
+            trace_data.append({
+                'step': head + 2,
                 'action': 'goal_found',
-                'current_state': copy.deepcopy(state.board),
+                'current_state': arena.board(head),
                 'solution_length': len(solution_path),
                 'message': f'Goal found! Solution has {len(solution_path)} moves'
             })
-            return solution_path, trace_data, expanded_nodes, max_depth
-
-        explored.add(state.to_tuple())
-        
-        neighbors = state.get_neighbors()
-        added_count = 0
+            return solution_path, trace_data, ArenaBoards(arena, 0, head + 1), g_costs[head]
 
-        for neighbor in neighbors:
-            neighbor_tuple = neighbor.to_tuple()
-            
-            if neighbor_tuple not in explored and neighbor_tuple not in frontier_set:
-                frontier.append(neighbor)
-                frontier_set.add(neighbor_tuple)
-                added_count += 1
-
-        if added_count > 0:
-            trace_data.append({
-                'step': step,
-                'action': 'expand',
-                'added_neighbors': added_count,
-                'frontier_size': len(frontier),
-                'explored_size': len(explored),
-                'message': f'Added {added_count} new neighbors to frontier'
-            })
+        g_cost = g_costs[head] + 1
+        for code, target, target_shift, blank_shift in table[blanks[head]]:
+            tile = (packed >> target_shift) & mask
+            child = packed - (tile << target_shift) + (tile << blank_shift)
+            if child not in seen:
+                seen.add(child)
+                arena.add(child, target, head, code, g_cost)
+        head += 1
 
     trace_data.append({
-        'step': step + 1,
+        'step': head + 1,
         'action': 'failed',
         'message': 'Goal not found - no solution exists'
     })
-    return None, trace_data, expanded_nodes, max_depth
+    return None, trace_data, ArenaBoards(arena, 0, head), g_costs[head - 1]
+
+
+
+def moves_to(state):
+    """Move names from the root of state's parent chain down to state."""
+    moves = []
+    while state.parent is not None:
+        moves.append(state.move)
+        state = state.parent
+    moves.reverse()
+    return moves
+
+
+def bidirectional_BFS(initialState, goalState, trace=True, expanded=True):
+    """
+    Breadth-first search from both ends, always expanding the smaller of the
+    forward and backward frontiers one full layer at a time. Meetings are detected
+    against the other direction's hashed states; the shortest meeting of a layer
+    is spliced into a single path (backward moves are inverted).
+    trace and expanded work as in BFS.
+
+    Returns:
+        (solution_path, trace_data, expanded_nodes, max_depth) like BFS; the last
+        trace entry reports 'forward_expanded' and 'backward_expanded'
+    """
+    if type(goalState) is not type(initialState):  # PuzzleState and PackedState keys never match
+        goalState = (PackedState.from_board(goalState.board) if isinstance(initialState, PackedState)
+                     else PuzzleState(goalState.board))
+    forward = {initialState.to_tuple(): initialState}
+    backward = {goalState.to_tuple(): goalState}
+    forward_layer, backward_layer = [initialState], [goalState]
+    forward_depth = backward_depth = 0
+    expanded_count = {'forward': 0, 'backward': 0}
+    expanded_nodes, record_expanded = expanded_recorder(expanded)
+    tracer = make_trace(trace)
+    try:
+        detailed, counting = tracer.detailed, tracer.counting
+        if not is_solvable(initialState.board, goalState.board):
+            if detailed:
+                tracer.emit({'step': 1, 'action': 'failed', 'message': UNSOLVABLE_MESSAGE})
+            elif counting:
+                tracer.count('failed')
+            return None, tracer.data, expanded_nodes, 0
+
+        if detailed:
+            tracer.emit({
+                'step': 0,
+                'action': 'initialize',
+                'current_state': copy.deepcopy(initialState.board),
+                'frontier_size': 2,
+                'explored_size': 0,
+                'message': 'Starting bidirectional BFS from initial and goal states'
+            })
+        elif counting:
+            tracer.count('initialize')
+        step = 0
+        meeting = (initialState, goalState) if initialState == goalState else None
+
+        while meeting is None and forward_layer and backward_layer:
+            step += 1
+            if len(forward_layer) <= len(backward_layer):
+                direction, layer, own, other = 'forward', forward_layer, forward, backward
+            else:
+                direction, layer, own, other = 'backward', backward_layer, backward, forward
+
+            next_layer = []
+            best = None
+            for state in layer:
+                expanded_count[direction] += 1
+                if record_expanded is not None:
+                    record_expanded(state)
+                for neighbor in state.get_neighbors():
+                    neighbor_tuple = neighbor.to_tuple()
+                    if neighbor_tuple in own:
+                        continue
+                    own[neighbor_tuple] = neighbor
+                    next_layer.append(neighbor)
+                    if neighbor_tuple in other:
+                        match = other[neighbor_tuple]
+                        # Keep the shortest meeting found while finishing this layer
+                        if best is None or match.depth < best[1].depth:
+                            best = (neighbor, match)
+
+            if direction == 'forward':
+                forward_layer, forward_depth = next_layer, forward_depth + 1
+            else:
+                backward_layer, backward_depth = next_layer, backward_depth + 1
+
+            if detailed:
+                tracer.emit({
+                    'step': step,
+                    'action': 'expand_layer',
+                    'direction': direction,
+                    'layer_size': len(layer),
+                    'added_neighbors': len(next_layer),
+                    'frontier_size': len(forward_layer) + len(backward_layer),
+                    'explored_size': len(forward) + len(backward),
+                    'message': f'Expanded {direction} layer of {len(layer)} states'
+                })
+            elif counting:
+                tracer.count('expand_layer')
+
+            if best is not None:
+                meeting = best if direction == 'forward' else (best[1], best[0])
+
+        max_depth = forward_depth + backward_depth
+        if meeting is None:
+            if detailed:
+                tracer.emit({
+                    'step': step + 1,
+                    'action': 'failed',
+                    'forward_expanded': expanded_count['forward'],
+                    'backward_expanded': expanded_count['backward'],
+                    'message': 'Goal not found - no solution exists'
+                })
+            elif counting:
+                tracer.count('failed')
+            return None, tracer.data, expanded_nodes, max_depth
+
+        forward_state, backward_state = meeting
+        moves = moves_to(forward_state) + [INVERSE_MOVES[move] for move in reversed(moves_to(backward_state))]
+        solution_path = path_from_moves(initialState, moves)
+        if detailed:
+            tracer.emit({
+                'step': step + 1,
+                'action': 'goal_found',
+                'forward_expanded': expanded_count['forward'],
+                'backward_expanded': expanded_count['backward'],
+                'solution_length': len(solution_path),
+                'message': f'Goal found! Solution has {len(solution_path)} moves'
+            })
+        elif counting:
+            tracer.count('goal_found')
+        return solution_path, tracer.data, expanded_nodes, max_depth
+    finally:
+        if tracer is not trace:
+            tracer.close()
@@ -1,11 +1,20 @@
-from puzzleState import PuzzleState, reconstruct_path
+from puzzleState import PuzzleState, reconstruct_path, is_solvable, UNSOLVABLE_MESSAGE
+from traceSink import make_trace
+from expandedLog import expanded_recorder
+from time import perf_counter
+from searchControl import CHECK_MASK
 import copy
 
-def DFS(initialState, goalState):
+def DFS(initialState, goalState, trace=True, expanded=True, stats=None, control=None):
     """    
     Args:
         initialState: PuzzleState object representing the start
         goalState: PuzzleState object representing the goal
+        trace: trace sink option (see traceSink.make_trace); True keeps every event
+        expanded: True keeps a deep copy of every expanded board, False none;
+            a writer such as expandedLog.ExpandedLogWriter streams them instead
+        stats: optional solverStats.SolverStats to fill with counters and sampled phase times
+        control: optional searchControl.SearchControl checked every CHECK_MASK + 1 expansions
     
     Returns:
         (solution_path, trace_data, expanded_nodes, max_depth)
@@ -13,82 +22,131 @@ def DFS(initialState, goalState):
     frontier = [initialState]           # Stack for DFS
     frontier_set = {initialState.to_tuple()}  # Set for O(1) frontier membership check
     explored = set()
-    expanded_nodes = []
-    trace_data = []
-    max_depth = 0
+    expanded_nodes, record_expanded = expanded_recorder(expanded)
+    tracer = make_trace(trace)
+    try:
+        detailed, counting = tracer.detailed, tracer.counting
+        max_depth = 0
 
-    trace_data.append({
-        'step': 0,
-        'action': 'initialize',
-        'current_state': copy.deepcopy(initialState.board),
-        'frontier_size': 1,
-        'explored_size': 0,
-        'message': 'Starting DFS with initial state'
-    })
-    
-    step = 0
-    
-    while frontier:
-        step += 1
-        state = frontier.pop()  # LIFO for DFS
-        state_tuple = state.to_tuple()
-        
-        # Defensive removal from frontier_set
-        if state_tuple in frontier_set:
-            frontier_set.remove(state_tuple)
-
-        expanded_nodes.append(copy.deepcopy(state.board))
-        max_depth = max(max_depth, state.depth)
+        if not is_solvable(initialState.board, goalState.board):
+            if detailed:
+                tracer.emit({'step': 1, 'action': 'failed', 'message': UNSOLVABLE_MESSAGE})
+            elif counting:
+                tracer.count('failed')
+            return None, tracer.data, expanded_nodes, max_depth
 
-        trace_data.append({
-            'step': step,
-            'action': 'pop',
-            'current_state': copy.deepcopy(state.board),
-            'depth': state.depth,
-            'move': state.move,
-            'frontier_size': len(frontier),
-            'explored_size': len(explored),
-            'message': f'Popped state (depth {state.depth})'
-        })
-
-        if state == goalState:
-            solution_path = reconstruct_path(state)
-            trace_data.append({
-                'step': step + 1,
-                'action': 'goal_found',
-                'current_state': copy.deepcopy(state.board),
-                'solution_length': len(solution_path),
-                'message': f'Goal found! Solution has {len(solution_path)} moves'
+        if detailed:
+            tracer.emit({
+                'step': 0,
+                'action': 'initialize',
+                'current_state': copy.deepcopy(initialState.board),
+                'frontier_size': 1,
+                'explored_size': 0,
+                'message': 'Starting DFS with initial state'
             })
-            return solution_path, trace_data, expanded_nodes, max_depth
+        elif counting:
+            tracer.count('initialize')
+        
+        step = 0
         
-        explored.add(state_tuple)
+        while frontier:
+            step += 1
+            timing = stats is not None and stats.sample()
+            if timing:
+                clock = perf_counter()
+            state = frontier.pop()  # LIFO for DFS
+            if timing:
+                stats.lap('open_list', clock)
+            if stats is not None:
+                stats.pops += 1
+            if control is not None and not step & CHECK_MASK:
+                control.checkpoint(step, depth=state.depth, stored=len(explored) + len(frontier))
+            state_tuple = state.to_tuple()
+            
+            # Defensive removal from frontier_set
+            if state_tuple in frontier_set:
+                frontier_set.remove(state_tuple)
+
+            if record_expanded is not None:
+                record_expanded(state)
+            max_depth = max(max_depth, state.depth)
 
-        neighbors = state.get_neighbors()
-        added_count = 0
+            if detailed:
+                tracer.emit({
+                    'step': step,
+                    'action': 'pop',
+                    'current_state': copy.deepcopy(state.board),
+                    'depth': state.depth,
+                    'move': state.move,
+                    'frontier_size': len(frontier),
+                    'explored_size': len(explored),
+                    'message': f'Popped state (depth {state.depth})'
+                })
+            elif counting:
+                tracer.count('pop')
 
-        for neighbor in neighbors:
-            neighbor_tuple = neighbor.to_tuple()
+            if state == goalState:
+                solution_path = reconstruct_path(state)
+                if detailed:
+                    tracer.emit({
+                        'step': step + 1,
+                        'action': 'goal_found',
+                        'current_state': copy.deepcopy(state.board),
+                        'solution_length': len(solution_path),
+                        'message': f'Goal found! Solution has {len(solution_path)} moves'
+                    })
+                elif counting:
+                    tracer.count('goal_found')
+                return solution_path, tracer.data, expanded_nodes, max_depth
             
-            # Use hashed checks for both frontier and explored
-            if neighbor_tuple not in explored and neighbor_tuple not in frontier_set:
-                frontier.append(neighbor)
-                frontier_set.add(neighbor_tuple)
-                added_count += 1
+            explored.add(state_tuple)
 
-        if added_count > 0:
-            trace_data.append({
-                'step': step,
-                'action': 'expand',
-                'added_neighbors': added_count,
-                'frontier_size': len(frontier),
-                'explored_size': len(explored),
-                'message': f'Added {added_count} new neighbors to frontier'
-            })
+            if timing:
+                clock = perf_counter()
+            neighbors = state.get_neighbors()
+            if timing:
+                clock = stats.lap('neighbors', clock)
+            added_count = 0
+
+            for neighbor in neighbors:
+                neighbor_tuple = neighbor.to_tuple()
+                
+                # Use hashed checks for both frontier and explored
+                if neighbor_tuple not in explored and neighbor_tuple not in frontier_set:
+                    frontier.append(neighbor)
+                    frontier_set.add(neighbor_tuple)
+                    added_count += 1
+            if timing:
+                stats.lap('hashing', clock)
+            if stats is not None:
+                stats.expanded += 1
+                stats.generated += len(neighbors)
+                stats.duplicates += len(neighbors) - added_count
+                stats.pushes += added_count
+                stats.frontier(len(frontier))
 
-    trace_data.append({
-        'step': step + 1,
-        'action': 'failed',
-        'message': 'Goal not found - no solution exists'
-    })
-    return None, trace_data, expanded_nodes, max_depth
+            if added_count > 0:
+                if detailed:
+                    tracer.emit({
+                        'step': step,
+                        'action': 'expand',
+                        'added_neighbors': added_count,
+                        'frontier_size': len(frontier),
+                        'explored_size': len(explored),
+                        'message': f'Added {added_count} new neighbors to frontier'
+                    })
+                elif counting:
+                    tracer.count('expand')
+
+        if detailed:
+            tracer.emit({
+                'step': step + 1,
+                'action': 'failed',
+                'message': 'Goal not found - no solution exists'
+            })
+        elif counting:
+            tracer.count('failed')
+        return None, tracer.data, expanded_nodes, max_depth
+    finally:
+        if tracer is not trace:
+            tracer.close()
@@ -0,0 +1,162 @@
+import copy
+import mmap
+import struct
+from packedState import PackedState, pack_board, tile_bits, unpack_board
+
+MAGIC = b'EXP1'
+HEADER = struct.Struct('<4sBBBxQ')  # magic, rows, cols, record width, pad, record count
+
+
+def record_width(rows, cols):
+    """Bytes per packed state record."""
+    return (rows * cols * tile_bits(rows, cols) + 7) // 8
+
+
+class ExpandedLogWriter:
+    """
+    Buffered writer of expanded states to a compact binary log: a fixed-size
+    header followed by one little-endian packed board per record.
+    Use as a context manager (or call close()) so the record count is written.
+    """
+    def __init__(self, path, rows, cols, buffer_size=1 << 16):
+        self.path = path
+        self.rows, self.cols = rows, cols
+        self.bits = tile_bits(rows, cols)
+        self.width = record_width(rows, cols)
+        self.buffer_size = buffer_size
+        self.buffer = bytearray()
+        self.count = 0
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, rows, cols, self.width, 0))
+
+    def append(self, state):
+        """Log a PuzzleState or PackedState."""
+        packed = state.packed if isinstance(state, PackedState) else pack_board(state.board)[0]
+        self.append_packed(packed)
+
+    def append_tiles(self, tiles):
+        """Log a flat row-major tile list."""
+        packed = 0
+        for index, tile in enumerate(tiles):
+            packed |= tile << (index * self.bits)
+        self.append_packed(packed)
+
+    def append_packed(self, packed):
+        self.buffer += packed.to_bytes(self.width, 'little')
+        self.count += 1
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.buffer.clear()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, self.rows, self.cols, self.width, self.count))
+        self.file.close()
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ExpandedLogReader:
+    """Memory-mapped, random-access view of an expanded-state log."""
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.rows, self.cols, self.width, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not an expanded-state log')
+
+    def __len__(self):
+        return self.count
+
+    def packed(self, i):
+        """Packed integer of record i."""
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError('expanded log index out of range')
+        offset = HEADER.size + i * self.width
+        return int.from_bytes(self.data[offset:offset + self.width], 'little')
+
+    def __getitem__(self, i):
+        return unpack_board(self.packed(i), self.rows, self.cols)
+
+    def __iter__(self):
+        width, rows, cols = self.width, self.rows, self.cols
+        data = self.data
+        for offset in range(HEADER.size, HEADER.size + self.count * width, width):
+            yield unpack_board(int.from_bytes(data[offset:offset + width], 'little'), rows, cols)
+
+    def export_text(self, path, header=True, chunk=1 << 16):
+        """Write the boards in the plain-text layout main.py has always produced."""
+        bits = tile_bits(self.rows, self.cols)
+        row_bits = self.cols * bits
+        row_mask = (1 << row_bits) - 1
+        row_text = {}  # Packed row -> formatted line; rows repeat a lot across boards
+        width, data = self.width, self.data
+        with open(path, 'w') as f:
+            if header:
+                f.write(f"Number of expanded nodes = {self.count}\n")
+            lines = []
+            for offset in range(HEADER.size, HEADER.size + self.count * width, width):
+                packed = int.from_bytes(data[offset:offset + width], 'little')
+                for _ in range(self.rows):
+                    row = packed & row_mask
+                    text = row_text.get(row)
+                    if text is None:
+                        text = row_text[row] = ''.join(
+                            f'{(row >> shift) & ((1 << bits) - 1)} ' for shift in range(0, row_bits, bits)) + '\n'
+                    lines.append(text)
+                    packed >>= row_bits
+                lines.append('\n')
+                if len(lines) >= chunk:
+                    f.write(''.join(lines))
+                    lines.clear()
+            f.write(''.join(lines))
+
+    def close(self):
+        self.data.close()
+
+
+def expanded_recorder(expanded):
+    """
+    Resolve a solver's expanded= option.
+    Args:
+        expanded: True (keep deep-copied boards in a list), False/None (keep nothing)
+                  or a writer with append(state), e.g. ExpandedLogWriter
+    Returns:
+        (expanded_nodes, record) where record(state) logs one expansion or is None
+    """
+    if expanded is True:
+        expanded_nodes = []
+        return expanded_nodes, lambda state: expanded_nodes.append(copy.deepcopy(state.board))
+    if expanded is None or expanded is False:
+        return [], None
+    return expanded, expanded.append
+
+
+class ExpansionCounter:
+    """expanded= target that only counts expansions."""
+    def __init__(self):
+        self.count = 0
+
+    def append(self, state):
+        self.count += 1
+
+    def append_tiles(self, tiles):
+        self.count += 1
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,252 @@
+import argparse
+import heapq
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+from puzzleState import path_from_moves, is_solvable
+from packedState import MOVE_NAMES, move_table, pack_board, tile_bits
+from expandedLog import record_width
+
+# Records are big-endian (packed_board << 8 | blank): byte order equals numeric order,
+# so files sort and merge as plain integers and the blank never has to be searched for.
+BLANK_BITS = 8
+MERGE_FAN_IN = 64  # Run files open at once while merging
+
+
+def read_records(path, width, chunk=1 << 16):
+    """Yield the integer records of a run/layer file in file order."""
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(width * chunk)
+            if not data:
+                return
+            for offset in range(0, len(data), width):
+                yield int.from_bytes(data[offset:offset + width], 'big')
+
+
+def write_records(path, records, width):
+    """Write integer records; returns how many were written."""
+    count = 0
+    buffer = bytearray()
+    with open(path, 'wb') as f:
+        for record in records:
+            buffer += record.to_bytes(width, 'big')
+            count += 1
+            if len(buffer) >= 1 << 20:
+                f.write(buffer)
+                buffer.clear()
+        f.write(buffer)
+    return count
+
+
+def unique(records):
+    """Drop consecutive duplicates from a sorted stream."""
+    previous = None
+    for record in records:
+        if record != previous:
+            yield record
+            previous = record
+
+
+def subtract(records, excluded):
+    """Sorted stream minus a second sorted stream (both ascending)."""
+    excluded = iter(excluded)
+    current = next(excluded, None)
+    for record in records:
+        while current is not None and current < record:
+            current = next(excluded, None)
+        if record != current:
+            yield record
+
+
+def reduce_runs(runs, width, fan_in=MERGE_FAN_IN):
+    """
+    Merge sorted run files in passes of at most fan_in files each until no more
+    than fan_in remain, so the number of open files stays bounded however many
+    runs a layer spilled. Merged inputs are deleted.
+    Returns:
+        the remaining run paths
+    """
+    generation = 0
+    while len(runs) > fan_in:
+        merged_runs = []
+        for first in range(0, len(runs), fan_in):
+            group = runs[first:first + fan_in]
+            path = f'{group[0]}.m{generation}'
+            write_records(path, unique(heapq.merge(*(read_records(run, width) for run in group))), width)
+            for run in group:
+                os.remove(run)
+            merged_runs.append(path)
+        runs = merged_runs
+        generation += 1
+    return runs
+
+
+def contains(data, width, count, record):
+    """Binary search for record in a memory-mapped sorted layer file."""
+    target = record.to_bytes(width, 'big')
+    low, high = 0, count
+    while low < high:
+        middle = (low + high) // 2
+        value = data[middle * width:(middle + 1) * width]
+        if value < target:
+            low = middle + 1
+        elif value > target:
+            high = middle
+        else:
+            return True
+    return False
+
+
+def external_BFS(initialState, goalState=None, work_dir=None, buffer_size=1 << 24, max_depth=None,
+                 verbose=False):
+    """
+    Breadth-first search with every depth layer kept in a sorted binary file on disk.
+    Children of layer d are collected in an in-memory buffer of at most buffer_size
+    bytes of records; each full buffer is sorted and spilled as a run file. The runs
+    are then k-way merged (in passes of at most MERGE_FAN_IN files), de-duplicated,
+    and layer d - 1 is merged out, giving layer d + 1. Every move changes the
+    permutation parity, so the move graph is bipartite and no child of layer d can
+    lie in layer d itself. RAM use is set by buffer_size, not by the search space.
+
+    Args:
+        initialState: PuzzleState/PackedState to search from
+        goalState: state to find, or None to enumerate every reachable state
+        work_dir: directory for layer and run files (default: a fresh temporary
+            directory, removed at the end)
+        buffer_size: bytes of memory the buffered child records may take before a
+            run is spilled; as Python ints in a list a record costs several times
+            its width on disk
+        max_depth: stop after this many layers
+        verbose: print each layer's count as it completes
+    Returns:
+        (solution_path, layer_counts) where layer_counts[d] is the number of states at
+        depth d; solution_path is None when there is no goal or it is not reachable
+    """
+    board = initialState.board
+    rows, cols = len(board), len(board[0])
+    bits = tile_bits(rows, cols)
+    mask = (1 << bits) - 1
+    table = move_table(rows, cols)
+    width = record_width(rows, cols) + 1
+    # A buffered record costs its list slot, its int object and up to half a slot of
+    # list.sort's merge space
+    slot = struct.calcsize('P')
+    buffer_records = max(1, buffer_size // (slot + slot // 2 + sys.getsizeof(1 << (8 * width - 1))))
+
+    start, blank = pack_board(board)
+    goal = None
+    if goalState is not None:
+        if not is_solvable(board, goalState.board):
+            return None, []
+        goal, goal_blank = pack_board(goalState.board)
+
+    own_dir = work_dir is None
+    work_dir = tempfile.mkdtemp(prefix='external_bfs_') if own_dir else work_dir
+    os.makedirs(work_dir, exist_ok=True)
+
+    def layer_path(depth):
+        return os.path.join(work_dir, f'layer_{depth}.bin')
+
+    write_records(layer_path(0), [start << BLANK_BITS | blank], width)
+    layer_counts = [1]
+    found = 0 if start == goal else None
+    try:
+        depth = 0
+        while found is None and layer_counts[-1] and (max_depth is None or depth < max_depth):
+            started = time.time()
+            runs, buffer = [], []
+
+            def spill():
+                path = os.path.join(work_dir, f'run_{depth + 1}_{len(runs)}.bin')
+                buffer.sort()
+                write_records(path, unique(buffer), width)
+                runs.append(path)
+                buffer.clear()
+
+            for record in read_records(layer_path(depth), width):
+                packed, blank = record >> BLANK_BITS, record & ((1 << BLANK_BITS) - 1)
+                for _, target, target_shift, blank_shift in table[blank]:
+                    tile = (packed >> target_shift) & mask
+                    child = packed - (tile << target_shift) + (tile << blank_shift)
+                    buffer.append(child << BLANK_BITS | target)
+                if len(buffer) >= buffer_records:
+                    spill()
+            if buffer:
+                spill()
+
+            spilled = len(runs)
+            runs = reduce_runs(runs, width)
+            merged = unique(heapq.merge(*(read_records(path, width) for path in runs)))
+            if depth > 0:
+                merged = subtract(merged, read_records(layer_path(depth - 1), width))
+            layer_counts.append(write_records(layer_path(depth + 1), merged, width))
+            for path in runs:
+                os.remove(path)
+            if goal is None and depth > 0:
+                os.remove(layer_path(depth - 1))  # Kept for path reconstruction only
+            depth += 1
+            if verbose:
+                print(f'Depth {depth}: {layer_counts[-1]} states ({time.time() - started:.1f}s, {spilled} runs)')
+
+            if goal is not None and layer_counts[-1]:
+                with open(layer_path(depth), 'rb') as f, \
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    if contains(data, width, layer_counts[-1], goal << BLANK_BITS | goal_blank):
+                        found = depth
+
+        if found is None:
+            return None, layer_counts if layer_counts[-1] else layer_counts[:-1]
+        moves = trace_back(goal, goal_blank, found, layer_path, layer_counts, table, mask, width)
+        return path_from_moves(initialState, moves), layer_counts
+    finally:
+        if own_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        else:
+            for depth in range(len(layer_counts)):
+                if os.path.exists(layer_path(depth)):
+                    os.remove(layer_path(depth))
+
+
+def trace_back(goal, blank, depth, layer_path, layer_counts, table, mask, width):
+    """
+    Walk from the goal at `depth` back through the stored layers: some neighbour of
+    every state at depth d + 1 lies in layer d, found by binary search.
+    Returns:
+        move names from the start to the goal
+    """
+    packed, moves = goal, []
+    for d in range(depth - 1, -1, -1):
+        with open(layer_path(d), 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for code, target, target_shift, blank_shift in table[blank]:
+                tile = (packed >> target_shift) & mask
+                parent = packed - (tile << target_shift) + (tile << blank_shift)
+                if contains(data, width, layer_counts[d], parent << BLANK_BITS | target):
+                    moves.append(MOVE_NAMES[code ^ 1])  # The parent's blank moved the other way
+                    packed, blank = parent, target
+                    break
+    moves.reverse()
+    return moves
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Count states per depth with an external-memory BFS')
+    parser.add_argument('rows', type=int)
+    parser.add_argument('cols', type=int)
+    parser.add_argument('--start', help='comma-separated start state (default 0,1,2,...)')
+    parser.add_argument('--buffer-size', type=int, default=1 << 24, help='bytes of records buffered before a run is spilled')
+    parser.add_argument('--work-dir', help='directory for layer files (default: a temporary directory)')
+    parser.add_argument('--max-depth', type=int, default=None)
+    args = parser.parse_args()
+    from packedState import PackedState
+    values = ([int(x) for x in args.start.split(',')] if args.start
+              else list(range(args.rows * args.cols)))
+    board = [values[i * args.cols:(i + 1) * args.cols] for i in range(args.rows)]
+    begin = time.time()
+    _, counts = external_BFS(PackedState.from_board(board), None, args.work_dir, args.buffer_size,
+                             args.max_depth, verbose=True)
+    print(f'{sum(counts)} states in {len(counts)} layers, {time.time() - begin:.1f}s')
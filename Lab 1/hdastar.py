@@ -0,0 +1,213 @@
+import multiprocessing
+import queue
+import time
+from puzzleState import path_from_moves, is_solvable
+from packedState import MOVE_NAMES, move_table, pack_board, tile_bits
+from heuristics import get_heuristic
+from openList import make_open_list
+
+EXPAND_BATCH = 64  # Expansions between inbox drains and outbox flushes
+NO_SOLUTION = 1 << 62
+MIX = 0x9E3779B97F4A7C15  # Fibonacci hashing spreads packed boards over the workers
+MASK64 = (1 << 64) - 1
+
+# Per-worker slots of the shared counter array
+SENT, RECEIVED, IDLE, EPOCH, EXPANDED = range(5)
+SLOTS = 5
+
+
+def owner(packed, workers):
+    """Worker that owns a packed board."""
+    return (((packed * MIX) & MASK64) >> 32) % workers
+
+
+def hda_worker(index, workers, inboxes, results, counters, best, stop, heuristic_func,
+               rows, cols, goal):
+    """
+    One HDA* partition: receives batches of (packed, blank, g, h, path) nodes it owns,
+    keeps their g-values and an open list, and routes generated children to their
+    owners in one batch per destination per round.
+    """
+    table = move_table(rows, cols)
+    bits = tile_bits(rows, cols)
+    mask = (1 << bits) - 1
+    cells = rows * cols
+    update = heuristic_func.update_tiles
+    inbox = inboxes[index]
+    for other in inboxes:
+        other.cancel_join_thread()  # Unread batches must not block exit once we are stopped
+    base = index * SLOTS
+    open_list = make_open_list(None, heuristic_func.integer)
+    g_values = {}  # packed -> (g, path bytes)
+
+    def accept(node):
+        packed, blank, g, h, path = node
+        known = g_values.get(packed)
+        if known is not None and known[0] <= g:
+            return
+        g_values[packed] = (g, path)
+        open_list.push((packed, blank, g, h), g + h, g)
+
+    while not stop.is_set():
+        # Receive: mark busy before counting so the coordinator never sees idle + balanced
+        while True:
+            try:
+                batch = inbox.get_nowait()
+            except queue.Empty:
+                break
+            counters[base + IDLE] = 0
+            counters[base + EPOCH] += 1
+            for node in batch:
+                accept(node)
+            counters[base + RECEIVED] += len(batch)
+
+        outboxes = [[] for _ in range(workers)]
+        expanded = 0
+        bound = best.value  # Incumbent cost, re-read once per round
+        while open_list and expanded < EXPAND_BATCH:
+            packed, blank, g, h = open_list.pop()
+            if g_values[packed][0] != g:
+                continue  # Stale: reached again with a smaller g
+            if g + h >= bound:
+                open_list = make_open_list(None, heuristic_func.integer)  # Nothing left can improve
+                break
+            expanded += 1
+            path = g_values[packed][1]
+            tiles = [(packed >> (i * bits)) & mask for i in range(cells)]
+            where = [0] * cells
+            for i, tile in enumerate(tiles):
+                where[tile] = i
+            for code, target, target_shift, blank_shift in table[blank]:
+                if path and code == path[-1] ^ 1:
+                    continue  # Undoing the previous move
+                tile = tiles[target]
+                tiles[blank], tiles[target], where[tile] = tile, 0, blank
+                child_h = update(h, tiles, tile, target, blank, where)
+                tiles[blank], tiles[target], where[tile] = 0, tile, target
+                child = packed - (tile << target_shift) + (tile << blank_shift)
+                child_g = g + 1
+                if child_g + child_h >= bound:
+                    continue
+                child_path = path + bytes((code,))
+                if child == goal:
+                    with best.get_lock():
+                        if child_g < best.value:
+                            best.value = child_g
+                            results.put((child_g, child_path))
+                        bound = best.value
+                    continue
+                destination = owner(child, workers)
+                node = (child, target, child_g, child_h, child_path)
+                if destination == index:
+                    accept(node)
+                else:
+                    outboxes[destination].append(node)
+        counters[base + EXPANDED] += expanded
+
+        for destination, batch in enumerate(outboxes):
+            if batch:
+                counters[base + SENT] += len(batch)  # Counted before it is in flight
+                inboxes[destination].put(batch)
+
+        if not open_list:
+            counters[base + IDLE] = 1
+            try:
+                batch = inbox.get(timeout=0.01)
+            except queue.Empty:
+                continue
+            counters[base + IDLE] = 0
+            counters[base + EPOCH] += 1
+            for node in batch:
+                accept(node)
+            counters[base + RECEIVED] += len(batch)
+
+
+def hdastar(initial_state, goal_state, heuristic='manhattan', workers=None, stats=None):
+    """
+    Hash-Distributed A* (Kishimoto et al.): every worker process owns the states
+    that hash to it, with its own open list and g-values, and children are sent
+    to their owners in batched queues.
+    The best goal cost found so far is shared, and nodes with f >= that cost are
+    pruned. The search ends when every worker is idle and every node sent has
+    been received, in two identical consecutive snapshots. Nothing with a smaller
+    f can then exist, so with an admissible heuristic the solution is optimal.
+
+    Args:
+        initial_state: PuzzleState/PackedState representing the start
+        goal_state: PuzzleState/PackedState representing the goal
+        heuristic: any heuristics.py option or object
+        workers: number of worker processes (default: CPU count)
+        stats: optional dict filled with 'expanded', 'per_worker', 'workers' and 'time'
+    Returns:
+        solution_path, or None if the goal is not reachable
+    """
+    board, goal_board = initial_state.board, goal_state.board
+    rows, cols = len(goal_board), len(goal_board[0])
+    workers = workers or multiprocessing.cpu_count()
+    if stats is not None:
+        stats.update(expanded=0, per_worker=[0] * workers, workers=workers, time=0.0)
+    if not is_solvable(board, goal_board):
+        return None
+    start, blank = pack_board(board)
+    goal, _ = pack_board(goal_board)
+    if start == goal:
+        return path_from_moves(initial_state, [])
+
+    heuristic_func = get_heuristic(heuristic, goal_board)  # Built once, inherited by fork
+    context = multiprocessing.get_context('fork')
+    inboxes = [context.Queue() for _ in range(workers)]
+    results = context.Queue()
+    counters = context.Array('q', SLOTS * workers + 1, lock=False)  # Last slot: nodes sent by us
+    best = context.Value('q', NO_SOLUTION)
+    stop = context.Event()
+    began = time.perf_counter()
+    processes = [context.Process(target=hda_worker, args=(i, workers, inboxes, results, counters, best,
+                                                          stop, heuristic_func, rows, cols, goal))
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+
+    counters[SLOTS * workers] = 1
+    inboxes[owner(start, workers)].put([(start, blank, 0, heuristic_func(board), b'')])
+
+    solution = None
+    previous = None
+    try:
+        while True:
+            time.sleep(0.005)
+            while True:
+                try:
+                    cost, path = results.get_nowait()
+                except queue.Empty:
+                    break
+                if solution is None or cost < solution[0]:
+                    solution = (cost, path)
+            snapshot = tuple(counters[:])
+            sent = snapshot[-1] + sum(snapshot[i * SLOTS + SENT] for i in range(workers))
+            received = sum(snapshot[i * SLOTS + RECEIVED] for i in range(workers))
+            idle = all(snapshot[i * SLOTS + IDLE] for i in range(workers))
+            if idle and sent == received and snapshot == previous:
+                break
+            previous = snapshot
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.kill()
+    # A result put just before termination may still be in the pipe
+    while True:
+        try:
+            cost, path = results.get(timeout=0.05)
+        except queue.Empty:
+            break
+        if solution is None or cost < solution[0]:
+            solution = (cost, path)
+
+    if stats is not None:
+        stats['per_worker'] = [counters[i * SLOTS + EXPANDED] for i in range(workers)]
+        stats['expanded'] = sum(stats['per_worker'])
+        stats['time'] = time.perf_counter() - began
+    if solution is None:
+        return None
+    return path_from_moves(initial_state, [MOVE_NAMES[code] for code in solution[1]])
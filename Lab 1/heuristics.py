@@ -0,0 +1,333 @@
+import math
+import os
+from bisect import bisect_left
+from packedState import PackedState, tile_bits
+
+
+def manhattan_distance(board, goal_board):
+    """
+    Manhattan distance heuristic = Sum of absolute differences in x and y coordinates.
+    """
+    distance = 0
+    rows, cols = len(board), len(board[0])
+
+    # Create a mapping of values to goal positions
+    goal_positions = {}
+    for i in range(rows):
+        for j in range(cols):
+            goal_positions[goal_board[i][j]] = (i, j)
+
+    # Calculate Manhattan distance for each tile (except blank/0)
+    for i in range(rows):
+        for j in range(cols):
+            value = board[i][j]
+            if value != 0:  # Skip blank tile
+                goal_i, goal_j = goal_positions[value]
+                distance += abs(i - goal_i) + abs(j - goal_j)
+
+    return distance
+
+def euclidean_distance(board, goal_board):
+    """
+    Calculate Euclidean distance heuristic = Straight-line distance between current and goal positions.
+    """
+    distance = 0.0
+    rows, cols = len(board), len(board[0])
+
+    # Create a mapping of values to goal positions
+    goal_positions = {}
+    for i in range(rows):
+        for j in range(cols):
+            goal_positions[goal_board[i][j]] = (i, j)
+
+    # Calculate Euclidean distance for each tile (except blank/0)
+    for i in range(rows):
+        for j in range(cols):
+            value = board[i][j]
+            if value != 0:  # Skip blank tile
+                goal_i, goal_j = goal_positions[value]
+                distance += math.sqrt((i - goal_i)**2 + (j - goal_j)**2)
+
+    return distance
+
+
+def moved_tile(parent, child):
+    """
+    Describe the single tile slide between parent and child.
+    Returns:
+        (tile, src, dst) with flat board indices: the tile moved from src
+        (the child's blank) to dst (the parent's blank)
+    """
+    if isinstance(child, PackedState):
+        src, dst = child.blank, parent.blank
+        bits = tile_bits(child.rows, child.cols)
+        tile = (child.packed >> (dst * bits)) & ((1 << bits) - 1)
+        return tile, src, dst
+    cols = len(child.board[0])
+    src_row, src_col = child.blank_pos
+    dst_row, dst_col = parent.blank_pos
+    return child.board[dst_row][dst_col], src_row * cols + src_col, dst_row * cols + dst_col
+
+
+def state_tiles(state):
+    """Flat row-major list of the tiles of a PuzzleState or PackedState."""
+    if isinstance(state, PackedState):
+        bits = tile_bits(state.rows, state.cols)
+        mask = (1 << bits) - 1
+        packed = state.packed
+        return [(packed >> (index * bits)) & mask for index in range(state.rows * state.cols)]
+    return [value for row in state.board for value in row]
+
+
+class TileDistanceHeuristic:
+    """
+    Sum of per-tile distances to the goal, precomputed once per goal as
+    table[tile][flat_index]. A move changes one tile's position, so the child's
+    value is the parent's value plus a two-entry table difference.
+    With debug=True every incremental value is cross-checked against the full recompute.
+    """
+    name = None
+    integer = True
+
+    def __init__(self, goal_board, debug=False):
+        self.goal_board = goal_board
+        self.rows, self.cols = len(goal_board), len(goal_board[0])
+        self.debug = debug
+        self.goal_positions = {}
+        for i in range(self.rows):
+            for j in range(self.cols):
+                self.goal_positions[goal_board[i][j]] = (i, j)
+        self.table = [None] * (self.rows * self.cols)
+        for tile, (goal_i, goal_j) in self.goal_positions.items():
+            if tile == 0:  # Blank tile contributes nothing
+                self.table[tile] = [0] * (self.rows * self.cols)
+                continue
+            self.table[tile] = [self.tile_distance(index // self.cols - goal_i, index % self.cols - goal_j)
+                                for index in range(self.rows * self.cols)]
+
+    def tile_distance(self, di, dj):
+        raise NotImplementedError
+
+    def reference(self, board):
+        """Full recompute with the original board-scanning function."""
+        raise NotImplementedError
+
+    def __call__(self, board):
+        """Full evaluation of a 2D board from the precomputed table."""
+        h = 0
+        index = 0
+        for row in board:
+            for value in row:
+                h += self.table[value][index]
+                index += 1
+        return h
+
+    def evaluate_tiles(self, tiles):
+        """Full evaluation of a flat row-major tile list."""
+        h = 0
+        for index, value in enumerate(tiles):
+            h += self.table[value][index]
+        return h
+
+    def update(self, h, tile, src, dst):
+        """O(1) update when tile slides from flat index src to dst."""
+        row = self.table[tile]
+        return h - row[src] + row[dst]
+
+    def update_tiles(self, h, tiles, tile, src, dst, where=None):
+        """Same as update(); tiles (the board after the move) and where are not needed here."""
+        return self.update(h, tile, src, dst)
+
+    def child(self, parent, h, child):
+        """Heuristic value of child given the parent's value h."""
+        tile, src, dst = moved_tile(parent, child)
+        value = self.update(h, tile, src, dst)
+        if self.debug:
+            self.check(child.board, value)
+        return value
+
+    def check(self, board, value):
+        expected = self.reference(board)
+        if not self.matches(value, expected):
+            raise AssertionError(f'{self.name}: incremental value {value} != full recompute {expected}')
+
+    def matches(self, value, expected):
+        return value == expected
+
+
+class ManhattanHeuristic(TileDistanceHeuristic):
+    name = 'Manhattan_Distance'
+
+    def tile_distance(self, di, dj):
+        return abs(di) + abs(dj)
+
+    def reference(self, board):
+        return manhattan_distance(board, self.goal_board)
+
+
+class EuclideanHeuristic(TileDistanceHeuristic):
+    """
+    Euclidean tile distances kept as fixed-point integers (scaled by 2**32), so
+    incremental updates are exact and equal the full table recompute bit for bit.
+    Values differ from euclidean_distance only by float rounding (< 1e-8).
+    """
+    name = 'Euclidean_Distance'
+    integer = False
+    SCALE = 1 << 32
+
+    def tile_distance(self, di, dj):
+        return round(math.sqrt(di**2 + dj**2) * self.SCALE)
+
+    def __call__(self, board):
+        return TileDistanceHeuristic.__call__(self, board) / self.SCALE
+
+    def evaluate_tiles(self, tiles):
+        return TileDistanceHeuristic.evaluate_tiles(self, tiles) / self.SCALE
+
+    def update(self, h, tile, src, dst):
+        # h * SCALE is exact: the scaled sum stays well inside a float's 53-bit mantissa
+        row = self.table[tile]
+        return (round(h * self.SCALE) - row[src] + row[dst]) / self.SCALE
+
+    def reference(self, board):
+        return euclidean_distance(board, self.goal_board)
+
+    def matches(self, value, expected):
+        return math.isclose(value, expected, rel_tol=1e-9, abs_tol=1e-8)
+
+
+def longest_increasing(sequence):
+    """Length of the longest strictly increasing subsequence."""
+    tails = []
+    for value in sequence:
+        i = bisect_left(tails, value)
+        if i == len(tails):
+            tails.append(value)
+        else:
+            tails[i] = value
+    return len(tails)
+
+
+class LinearConflictHeuristic:
+    """
+    Manhattan distance plus linear conflicts: in every row (column), the tiles whose
+    goal is that row (column) but that sit out of goal order must leave the line and
+    come back. At least len(line tiles) - LIS of them have to, each costing 2 extra moves.
+    A move only reorders the two lines it crosses, so updates re-score just those.
+    """
+    name = 'Linear_Conflict'
+    integer = True
+
+    def __init__(self, goal_board, debug=False):
+        self.manhattan = ManhattanHeuristic(goal_board)
+        self.rows, self.cols = len(goal_board), len(goal_board[0])
+        self.debug = debug
+        n = self.rows * self.cols
+        self.goal_row, self.goal_col = [0] * n, [0] * n
+        for tile, (goal_i, goal_j) in self.manhattan.goal_positions.items():
+            self.goal_row[tile], self.goal_col[tile] = goal_i, goal_j
+        # Lines 0..rows-1 are rows, rows..rows+cols-1 are columns
+        self.lines = ([list(range(r * self.cols, (r + 1) * self.cols)) for r in range(self.rows)]
+                      + [list(range(c, n, self.cols)) for c in range(self.cols)])
+        self.penalties = {}  # Goal-order sequence -> 2 * tiles that must leave the line
+
+    def line_penalty(self, line, tiles):
+        """Conflict penalty of line given its tiles in cell order."""
+        if line < self.rows:
+            order = tuple(self.goal_col[t] for t in tiles if t and self.goal_row[t] == line)
+        else:
+            column = line - self.rows
+            order = tuple(self.goal_row[t] for t in tiles if t and self.goal_col[t] == column)
+        penalty = self.penalties.get(order)
+        if penalty is None:
+            penalty = self.penalties[order] = 2 * (len(order) - longest_increasing(order))
+        return penalty
+
+    def evaluate_tiles(self, tiles):
+        """Full evaluation of a flat row-major tile list."""
+        h = self.manhattan.evaluate_tiles(tiles)
+        for line, cells in enumerate(self.lines):
+            h += self.line_penalty(line, [tiles[i] for i in cells])
+        return h
+
+    def __call__(self, board):
+        return self.evaluate_tiles([value for row in board for value in row])
+
+    def update_tiles(self, h, tiles, tile, src, dst, where=None):
+        """Update h after tile slid from src to dst; tiles is the board after the move."""
+        h = self.manhattan.update(h, tile, src, dst)
+        cols = self.cols
+        # The tile leaves one line and enters another; only its goal line can change score
+        if src // cols == dst // cols:
+            line = self.rows + self.goal_col[tile]  # Horizontal move crosses two columns
+            if self.goal_col[tile] not in (src % cols, dst % cols):
+                return h
+        else:
+            line = self.goal_row[tile]
+            if line not in (src // cols, dst // cols):
+                return h
+        cells = self.lines[line]
+        after = [tiles[i] for i in cells]
+        before = [tile if i == src else 0 if i == dst else tiles[i] for i in cells]
+        return h + self.line_penalty(line, after) - self.line_penalty(line, before)
+
+    def child(self, parent, h, child):
+        tile, src, dst = moved_tile(parent, child)
+        tiles = state_tiles(child)
+        value = self.update_tiles(h, tiles, tile, src, dst)
+        if self.debug:
+            expected = self.evaluate_tiles(tiles)
+            if value != expected:
+                raise AssertionError(f'{self.name}: incremental value {value} != full recompute {expected}')
+        return value
+
+
+def walking_distance_heuristic(goal_board, debug=False):
+    from walkingDistance import WalkingDistanceHeuristic
+    return WalkingDistanceHeuristic(goal_board, debug)
+
+
+def auto_heuristic(goal_board, debug=False):
+    """
+    Strongest heuristic that is cheap to set up for the board's shape: pattern
+    databases when they are small (up to 9 cells) or already built, walking
+    distance up to 4x4 and linear conflicts beyond that.
+    """
+    from patternDatabase import parse_partition, pdb_path
+    rows, cols = len(goal_board), len(goal_board[0])
+    if rows * cols <= 9 or os.path.exists(pdb_path(goal_board, parse_partition(None, rows, cols))):
+        return pattern_database_heuristic(goal_board, debug)
+    if rows <= 4 and cols <= 4:
+        return walking_distance_heuristic(goal_board, debug)
+    return LinearConflictHeuristic(goal_board, debug)
+
+
+def pattern_database_heuristic(goal_board, debug=False):
+    # Imported lazily: the tables are only mapped when the option is used
+    from patternDatabase import PatternDatabaseHeuristic
+    return PatternDatabaseHeuristic(goal_board, debug)
+
+
+HEURISTICS = {
+    'manhattan': ManhattanHeuristic,
+    'euclidean': EuclideanHeuristic,
+    'pdb': pattern_database_heuristic,
+    'linear_conflict': LinearConflictHeuristic,
+    'walking_distance': walking_distance_heuristic,
+    'auto': auto_heuristic,
+}
+
+
+def get_heuristic(heuristic, goal_board, debug=False):
+    """
+    Resolve a heuristic option to a heuristic object for goal_board.
+    Args:
+        heuristic: a name from HEURISTICS or an already built heuristic object
+        goal_board: 2D goal board the tables are precomputed for
+        debug: cross-check incremental updates against the full recompute
+    """
+    if not isinstance(heuristic, str):
+        return heuristic
+    if heuristic not in HEURISTICS:
+        raise ValueError(f"Unknown heuristic '{heuristic}', expected one of {', '.join(HEURISTICS)}")
+    return HEURISTICS[heuristic](goal_board, debug)
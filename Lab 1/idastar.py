@@ -0,0 +1,145 @@
+from puzzleState import path_from_moves, is_solvable, UNSOLVABLE_MESSAGE
+from packedState import MOVE_NAMES, move_table
+from heuristics import get_heuristic, state_tiles
+from traceSink import make_trace
+from searchControl import CHECK_MASK
+
+FOUND = -1
+
+
+def IDAstar(initialState, goalState, heuristic='manhattan', max_bound=200, trace=False, expanded=False,
+            control=None):
+    """
+    Iterative Deepening A*: repeated depth-first searches bounded by f = g + h,
+    each bound being the smallest f that exceeded the previous one.
+    A single flat board is mutated in place (make/unmake), the inverse of the
+    previous move is pruned, and memory stays O(solution depth).
+
+    Args:
+        initialState: PuzzleState/PackedState representing the start
+        goalState: PuzzleState/PackedState representing the goal
+        heuristic: any heuristics.py option ('manhattan', 'euclidean', 'pdb', ...) or object
+        max_bound: give up once the f-bound exceeds this value
+        trace: trace sink option (see traceSink.make_trace); True collects one entry per iteration
+        expanded: True keeps a board snapshot per expansion (O(nodes) memory);
+                  a writer such as expandedLog.ExpandedLogWriter streams them instead
+        control: optional searchControl.SearchControl checked every CHECK_MASK + 1 expansions
+    Returns:
+        (solution_path, trace_data, expanded_nodes, max_depth, heuristic_name)
+    """
+    goal_board = goalState.board
+    rows, cols = len(goal_board), len(goal_board[0])
+    heuristic_func = get_heuristic(heuristic, goal_board)
+    update = heuristic_func.update_tiles
+    update_codes = getattr(heuristic_func, 'update_codes', None)  # Walking distance: codes kept alongside h
+    table = move_table(rows, cols)
+
+    tiles = state_tiles(initialState)
+    goal_tiles = state_tiles(goalState)
+    where = [0] * len(tiles)  # Tile -> cell, kept in step with tiles for the heuristic updates
+    for index, tile in enumerate(tiles):
+        where[tile] = index
+    moves = []  # Move codes of the current path
+    log = None if expanded is None or isinstance(expanded, bool) else expanded
+    expanded_nodes = [] if log is None else log
+    tracer = make_trace(trace)
+    try:
+        detailed, counting = tracer.detailed, tracer.counting
+        counters = {'expanded': 0, 'max_depth': 0}
+        if not is_solvable(initialState.board, goal_board):
+            if detailed:
+                tracer.emit({'step': 0, 'action': 'failed', 'message': UNSOLVABLE_MESSAGE})
+            elif counting:
+                tracer.count('failed')
+            return None, tracer.data, expanded_nodes, 0, heuristic_func.name
+
+        def search(blank, g, h, bound, previous, codes):
+            f = g + h
+            if f > bound:
+                return f
+            if h == 0 and tiles == goal_tiles:
+                return FOUND
+
+            counters['expanded'] += 1
+            if control is not None and not counters['expanded'] & CHECK_MASK:
+                control.checkpoint(counters['expanded'], f_bound=bound, depth=g)
+            if g > counters['max_depth']:
+                counters['max_depth'] = g
+            if log is not None:
+                log.append_tiles(tiles)
+            elif expanded:
+                expanded_nodes.append([tiles[i * cols:(i + 1) * cols] for i in range(rows)])
+
+            minimum = float('inf')
+            for code, target, _, _ in table[blank]:
+                if code == previous ^ 1:  # Up/Down and Left/Right are inverse pairs
+                    continue
+                # Make: slide the tile at target into the blank
+                tile = tiles[target]
+                tiles[blank] = tile
+                tiles[target] = 0
+                where[tile] = blank
+                moves.append(code)
+                if update_codes is None:
+                    child_h, child_codes = update(h, tiles, tile, target, blank, where), None
+                else:
+                    child_h, child_codes = update_codes(codes, tile, target, blank)
+                result = search(target, g + 1, child_h, bound, code, child_codes)
+                if result == FOUND:
+                    return FOUND
+                # Unmake
+                moves.pop()
+                tiles[target] = tile
+                tiles[blank] = 0
+                where[tile] = target
+                if result < minimum:
+                    minimum = result
+            return minimum
+
+        h_initial = heuristic_func.evaluate_tiles(tiles)
+        codes_initial = heuristic_func.codes(tiles) if update_codes is not None else None
+        bound = h_initial
+        iteration = 0
+        while bound <= max_bound:
+            if detailed:
+                tracer.emit({
+                    'step': iteration,
+                    'action': 'start_iteration',
+                    'f_bound': bound,
+                    'expanded_so_far': counters['expanded'],
+                    'message': f'Starting depth-first search with f-bound {bound}'
+                })
+            elif counting:
+                tracer.count('start_iteration')
+            result = search(tiles.index(0), 0, h_initial, bound, -2, codes_initial)
+            if result == FOUND:
+                solution_path = path_from_moves(initialState, [MOVE_NAMES[code] for code in moves])
+                if detailed:
+                    tracer.emit({
+                        'step': iteration + 1,
+                        'action': 'goal_found',
+                        'total_cost': len(moves),
+                        'expanded': counters['expanded'],
+                        'message': f'Goal found with f-bound {bound}'
+                    })
+                elif counting:
+                    tracer.count('goal_found')
+                return solution_path, tracer.data, expanded_nodes, counters['max_depth'], heuristic_func.name
+            if result == float('inf'):
+                break  # Nothing left beyond the bound: the goal is unreachable
+            bound = result
+            iteration += 1
+
+        if detailed:
+            tracer.emit({
+                'step': iteration + 1,
+                'action': 'failed',
+                'expanded': counters['expanded'],
+                'message': f'No solution found within f-bound {max_bound}'
+            })
+        elif counting:
+            tracer.count('failed')
+        return None, tracer.data, expanded_nodes, counters['max_depth'], heuristic_func.name
+    finally:
+        if tracer is not trace:
+            tracer.close()
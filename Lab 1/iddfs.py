@@ -1,69 +1,100 @@
-from puzzleState import PuzzleState, reconstruct_path
-import copy
+from puzzleState import PuzzleState, reconstruct_path, is_solvable, UNSOLVABLE_MESSAGE
+from traceSink import make_trace
+from expandedLog import expanded_recorder
+from time import perf_counter
+from searchControl import CHECK_MASK
 
-def IDDFS(initialState, goalState, max_depth_limit=35, trace=False):
+def IDDFS(initialState, goalState, max_depth_limit=35, trace=False, expanded=True, stats=None,
+          control=None):
     """
     Iterative Deepening DFS for 8-puzzle.
     Args:
         initialState : PuzzleState (initial configuration)
         goalState : PuzzleState (goal configuration)
         max_depth_limit : maximum depth limit for IDDFS
-        trace : if True, collects debugging trace data
+        trace : trace sink option (see traceSink.make_trace); True collects debugging trace data
+        expanded : True keeps a copy of every distinct expanded board, False none;
+                   a writer such as expandedLog.ExpandedLogWriter streams them instead
+        stats : optional solverStats.SolverStats; expanded counts every expansion of
+                every iteration, reopened the states expanded again at a smaller depth
+        control : optional searchControl.SearchControl; counts pops over all iterations
     Returns:
         (solution_path, trace_data, expanded_nodes, max_depth) if found
         (None, trace_data, expanded_nodes, max_depth) if not found
     """
-    expanded_nodes = []
+    expanded_nodes, record_expanded = expanded_recorder(expanded)
     expanded_set = set()
-    trace_data = []
-    max_depth_reached = 0
-    step = 0
-    
-    for limit in range(max_depth_limit + 1):
-        if trace:
-            trace_data.append({
+    tracer = make_trace(trace)
+    try:
+        detailed, counting = tracer.detailed, tracer.counting
+        max_depth_reached = 0
+        step = 0
+        popped = 0  # Over all iterations, for control checkpoints
+
+        if not is_solvable(initialState.board, goalState.board):
+            if detailed:
+                tracer.emit({'step': 1, 'action': 'failed', 'message': UNSOLVABLE_MESSAGE})
+            elif counting:
+                tracer.count('failed')
+            return None, tracer.data, expanded_nodes, max_depth_reached
+
+        for limit in range(max_depth_limit + 1):
+            if detailed:
+                tracer.emit({
+                    'step': step,
+                    'action': 'start_iteration',
+                    'depth_limit': limit,
+                    'message': f'Starting DFS with depth limit {limit}'
+                })
+            elif counting:
+                tracer.count('start_iteration')
+            
+            solution, found, depth_reached, popped = depth_limited_DFS(
+                initialState, goalState, limit,
+                record_expanded, expanded_set, tracer, stats, control, popped
+            )
+            
+            max_depth_reached = max(max_depth_reached, depth_reached)
+            
+            if found:
+                if detailed:
+                    tracer.emit({
+                        'step': step + 1,
+                        'action': 'goal_found',
+                        'message': f'Goal found at depth {limit}'
+                    })
+                elif counting:
+                    tracer.count('goal_found')
+                return solution, tracer.data, expanded_nodes, max_depth_reached
+            
+            step += 1
+        
+        if detailed:
+            tracer.emit({
                 'step': step,
-                'action': 'start_iteration',
-                'depth_limit': limit,
-                'message': f'Starting DFS with depth limit {limit}'
+                'action': 'no_solution',
+                'message': f'No solution found up to depth {max_depth_limit}'
             })
+        elif counting:
+            tracer.count('no_solution')
         
-        solution, found, depth_reached = depth_limited_DFS(
-            initialState, goalState, limit,
-            expanded_nodes, expanded_set, trace_data, trace
-        )
-        
-        max_depth_reached = max(max_depth_reached, depth_reached)
-        
-        if found:
-            if trace:
-                trace_data.append({
-                    'step': step + 1,
-                    'action': 'goal_found',
-                    'message': f'Goal found at depth {limit}'
-                })
-            return solution, trace_data, expanded_nodes, max_depth_reached
-        
-        step += 1
-    
-    if trace:
-        trace_data.append({
-            'step': step,
-            'action': 'no_solution',
-            'message': f'No solution found up to depth {max_depth_limit}'
-        })
-    
-    return None, trace_data, expanded_nodes, max_depth_reached
+        return None, tracer.data, expanded_nodes, max_depth_reached
+    finally:
+        if tracer is not trace:
+            tracer.close()
 
 
 def depth_limited_DFS(state, goalState, limit,
-                      expanded_nodes, expanded_set,
-                      trace_data, trace=False):
+                      record_expanded, expanded_set, tracer, stats=None, control=None, popped=0):
     """
     Performs depth-limited DFS with depth-aware exploration.
     Key modification: Track explored states WITH their depths to allow
     revisiting at different depths for optimality.
+    Returns:
+        (solution, found, max_depth, popped) where popped adds this iteration's pops
+        to the count passed in
     """
+    detailed, counting = tracer.detailed, tracer.counting
     frontier = [state]
     frontier_set = {state.to_tuple()}
     explored = {}  # Changed: now maps state_tuple -> depth at which it was explored
@@ -71,26 +102,40 @@ def depth_limited_DFS(state, goalState, limit,
     step = 0
     
     while frontier:
+        timing = stats is not None and stats.sample()
+        if timing:
+            clock = perf_counter()
         current_state = frontier.pop()
         current_tuple = current_state.to_tuple()
         frontier_set.discard(current_tuple)
+        if timing:
+            stats.lap('open_list', clock)
+        if stats is not None:
+            stats.pops += 1
+        popped += 1
+        if control is not None and not popped & CHECK_MASK:
+            control.checkpoint(popped, depth_limit=limit)
         
         # Skip if already explored at THIS depth or shallower
         if current_tuple in explored and explored[current_tuple] <= current_state.depth:
+            if stats is not None:
+                stats.duplicates += 1
             continue
+        if stats is not None and current_tuple in explored:
+            stats.reopened += 1
         
         # Mark as explored at this depth
         explored[current_tuple] = current_state.depth
         
         # Track for global expanded nodes
-        if current_tuple not in expanded_set:
-            expanded_nodes.append(current_state.board.copy())
+        if record_expanded is not None and current_tuple not in expanded_set:
+            record_expanded(current_state)
             expanded_set.add(current_tuple)
         
         max_depth = max(max_depth, current_state.depth)
         
-        if trace:
-            trace_data.append({
+        if detailed:
+            tracer.emit({
                 'step': step,
                 'action': 'pop',
                 'current_state': current_state.board.copy(),
@@ -99,14 +144,22 @@ def depth_limited_DFS(state, goalState, limit,
                 'explored_size': len(explored),
                 'message': f"Popped node at depth {current_state.depth} (limit {limit})"
             })
+        elif counting:
+            tracer.count('pop')
         
         # Goal test
         if current_state == goalState:
-            return reconstruct_path(current_state), True, max_depth
+            return reconstruct_path(current_state), True, max_depth, popped
         
         # Expand if under depth limit
         if current_state.depth < limit:
-            for neighbor in reversed(current_state.get_neighbors()):
+            if timing:
+                clock = perf_counter()
+            neighbors = current_state.get_neighbors()
+            if timing:
+                clock = stats.lap('neighbors', clock)
+            added_count = 0
+            for neighbor in reversed(neighbors):
                 neighbor_tuple = neighbor.to_tuple()
                 neighbor_depth = current_state.depth + 1
                 
@@ -118,7 +171,16 @@ def depth_limited_DFS(state, goalState, limit,
                    neighbor_tuple not in frontier_set:
                     frontier.append(neighbor)
                     frontier_set.add(neighbor_tuple)
+                    added_count += 1
+            if timing:
+                stats.lap('hashing', clock)
+            if stats is not None:
+                stats.expanded += 1
+                stats.generated += len(neighbors)
+                stats.duplicates += len(neighbors) - added_count
+                stats.pushes += added_count
+                stats.frontier(len(frontier))
         
         step += 1
     
-    return None, False, max_depth
\ No newline at end of file
+    return None, False, max_depth, popped
\ No newline at end of file
@@ -1,29 +1,65 @@
 import math
 from bfs import BFS
 from astar import astar, print_astar_solution
-from puzzleState import PuzzleState
+from heuristics import HEURISTICS
+from puzzleState import is_solvable
+from packedState import PackedState
 from dfs import DFS
 from iddfs import IDDFS
+from idastar import IDAstar
+from arastar import ARAStar
+from beamSearch import greedy_best_first, beam_search
+from oracle import oracle_solve, MAX_CELLS as ORACLE_MAX_CELLS
+from expandedLog import ExpandedLogWriter, ExpandedLogReader
+from solverStats import SolverStats
+import argparse
+import cProfile
+import pstats
 import time
-def parse_state(state_string, size=3):
+import tracemalloc
+def parse_shape(shape_string):
+    """
+    Parse a board shape.
+    Args:
+        shape_string: "4" for 4x4 or "RxC" (e.g. "3x5") for R rows and C columns
+    Returns:
+        (rows, cols)
+    """
+    parts = shape_string.lower().replace('×', 'x').split('x')
+    if len(parts) == 1:
+        parts = parts * 2
+    if len(parts) != 2:
+        raise ValueError(f"Expected a shape like '4' or '3x5', got '{shape_string}'")
+    rows, cols = int(parts[0]), int(parts[1])
+    if rows < 1 or cols < 1 or rows * cols < 2:
+        raise ValueError(f"Board must have at least 2 cells, got {rows}x{cols}")
+    return rows, cols
+
+
+def parse_state(state_string, size=3, cols=None):
     """
     Convert comma-separated string to 2D board.
     Args:
         state_string: e.g., "1,2,0,3,4,5,6,7,8"
-        size: board dimension (3 for 3x3, 4 for 4x4, etc.)
+        size: number of rows (3 for 3x3, 4 for 4x4, etc.)
+        cols: number of columns (defaults to size, a square board)
     Returns:
         2D list representing the board
     """
+    rows = size
+    cols = cols or size
     numbers = [int(x.strip()) for x in state_string.split(',')]
     
     # Validate input
-    if len(numbers) != size * size:
-        raise ValueError(f"Expected {size*size} numbers, got {len(numbers)}")
+    if len(numbers) != rows * cols:
+        raise ValueError(f"Expected {rows*cols} numbers, got {len(numbers)}")
+    if sorted(numbers) != list(range(rows * cols)):
+        raise ValueError(f"Expected each of 0..{rows*cols - 1} exactly once")
     
     # Convert to 2D board
     board = []
-    for i in range(size):
-        row = numbers[i * size:(i + 1) * size]
+    for i in range(rows):
+        row = numbers[i * cols:(i + 1) * cols]
         board.append(row)
     
     return board
@@ -44,23 +80,77 @@ def print_solution(solution):
     else:
         print("\nNo solution found!")
 
-def main():
-    print("8-Puzzle Solver")
+def run_instrumented(name, call, profile=False, memory=False):
+    """
+    Run call() optionally under cProfile and/or tracemalloc. The reports are written
+    next to the solver's other output files: <name>.prof (pstats data) and
+    <name>_profile.txt for cProfile, <name>_tracemalloc.txt for tracemalloc.
+    Returns:
+        whatever call() returns
+    """
+    profiler = cProfile.Profile() if profile else None
+    if memory:
+        tracemalloc.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        return call()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(f'{name}.prof')
+            with open(f'{name}_profile.txt', 'w') as f:
+                pstats.Stats(profiler, stream=f).sort_stats('cumulative').print_stats(40)
+        if memory:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            with open(f'{name}_tracemalloc.txt', 'w') as f:
+                f.write(f'Peak traced memory: {peak} bytes\nStill allocated at the end: {current} bytes\n\n')
+                f.write('Largest allocation sites still alive at the end:\n')
+                for stat in snapshot.statistics('lineno')[:25]:
+                    f.write(f'{stat}\n')
+
+def report_stats(name, stats):
+    """Print a SolverStats summary and save it as <name>_stats.json."""
+    if stats is not None:
+        print("\nSolver stats:")
+        print(stats.report())
+        stats.dump(f'{name}_stats.json')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Interactive sliding puzzle solver')
+    parser.add_argument('--profile', action='store_true', help='run the solver under cProfile (<name>.prof, <name>_profile.txt)')
+    parser.add_argument('--tracemalloc', action='store_true', help='trace allocations (<name>_tracemalloc.txt)')
+    parser.add_argument('--stats', action='store_true', help='print solver counters for BFS/DFS/IDDFS/A* (<name>_stats.json)')
+    parser.add_argument('--sample-every', type=int, default=64, help='with --stats, time the phases of every N-th expansion (0: off)')
+    args = parser.parse_args(argv)
+    stats = SolverStats(args.sample_every) if args.stats else None
+
+    def run(name, call):
+        return run_instrumented(name, call, args.profile, args.tracemalloc)
+
+    print("Sliding Puzzle Solver")
     print("="*50)
     
+    # Board shape, e.g. 3 (8-puzzle), 4 (15-puzzle) or 3x5
+    rows, cols = parse_shape(input("Board shape (default 3x3): ").strip() or '3')
+    
     # Get initial state from user
     print("\nEnter initial state as comma-separated numbers (0 for blank)")
-    print("Example: 1,2,0,3,4,5,6,7,8")
+    print(f"Example: {','.join(str(i) for i in range(rows * cols))}")
     initial_input = input("Initial state: ").strip()
     
-    goal_input = "0,1,2,3,4,5,6,7,8"
+    goal_input = input("Goal state (default 0,1,2,...): ").strip()
+    goal_input = goal_input or ','.join(str(i) for i in range(rows * cols))
     
     # Parse inputs
-    initial_board = parse_state(initial_input)
-    goal_board = parse_state(goal_input)
+    initial_board = parse_state(initial_input, rows, cols)
+    goal_board = parse_state(goal_input, rows, cols)
     
-    initial = PuzzleState(initial_board)
-    goal = PuzzleState(goal_board)
+    # Packed boards and per-shape move tables are used for every shape
+    initial = PackedState.from_board(initial_board)
+    goal = PackedState.from_board(goal_board)
 
     
     print("\nInitial State:")
@@ -69,60 +159,61 @@ def main():
     print(goal)
     print("\n" + "="*50)
     
+    if not is_solvable(initial_board, goal_board):
+        print("\nThis state cannot reach the goal (permutation parity does not match the blank distance).")
+        return
+    
     # Menu
     print("\nSelect Search Algorithm:")
     print("1. BFS")
     print("2. DFS")
     print("3. IDDFS")
     print("4. A*")
-    print("5. Exit")
+    print("5. IDA*")
+    print("6. Oracle (table lookup)")
+    print("7. ARA* (anytime, time budget)")
+    print("8. Greedy best-first")
+    print("9. Beam search")
+    print("10. Auto (pick an algorithm)")
+    print("11. Exit")
     
-    choice = input("\nEnter your choice (1-5): ")
+    choice = input("\nEnter your choice (1-11): ")
     
     if choice == '1':
         print("\nRunning BFS...")
         start = time.time()
-        solution, trace,expanded,depth = BFS(initial, goal)
+        with ExpandedLogWriter('bfs.bin', rows, cols) as log:
+            solution, trace,expanded,depth = run('bfs', lambda: BFS(initial, goal, expanded=log, stats=stats))
         end = time.time()
         time_elapsed = end - start
         print(f"\nStates explored: {trace[-2]['explored_size'] if len(trace) > 1 else 0}")
         print_solution(solution)
         print(f"Execution Time : {time_elapsed}")
         print(f'Max Depth : {depth}')
-        with open('bfs.txt','w') as F:
-            F.write(f"Number of expanded nodes = {len(expanded)}\n")
-            for matrix in expanded:
-                for row in matrix:
-                    for element in row:
-                        F.write(f"{str(element)} ")
-                    F.write("\n")
-                F.write("\n")
+        report_stats('bfs', stats)
+        ExpandedLogReader('bfs.bin').export_text('bfs.txt')
         
     elif choice == '2':
         print("\nRunning DFS...")
         start = time.time()
-        solution, trace,expanded,depth = DFS(initial, goal)
+        with ExpandedLogWriter('dfs.bin', rows, cols) as log:
+            solution, trace,expanded,depth = run('dfs', lambda: DFS(initial, goal, expanded=log, stats=stats))
         end = time.time()
         time_elapsed = end - start
         print(f"\nStates explored: {trace[-2]['explored_size'] if len(trace) > 1 else 0}")
         print_solution(solution)
         print(f"Execution Time : {time_elapsed}")
         print(f'Max Depth : {depth}')
-        with open('dfs.txt','w') as F:
-            F.write(f"Number of expanded nodes = {len(expanded)}\n")
-            for matrix in expanded:
-                for row in matrix:
-                    for element in row:
-                        F.write(f"{str(element)} ")
-                    F.write("\n")
-                F.write("\n")
+        report_stats('dfs', stats)
+        ExpandedLogReader('dfs.bin').export_text('dfs.txt')
 
         
         
     elif choice == '3':
         print("\nRunning IDDFS...")
         start = time.time()
-        solution, trace, expanded, depth = IDDFS(initial, goal)
+        with ExpandedLogWriter('iddfs.bin', rows, cols) as log:
+            solution, trace, expanded, depth = run('iddfs', lambda: IDDFS(initial, goal, expanded=log, stats=stats))
         end = time.time()
         time_elapsed = end - start
     
@@ -133,41 +224,136 @@ def main():
         print_solution(solution)
         print(f"Execution Time: {time_elapsed:.5f} seconds")
         print(f"Max Depth Reached: {depth}")
+        report_stats('iddfs', stats)
     
         # Save expanded nodes to file
-        with open('iddfs.txt', 'w') as f:
-            f.write(f"Number of expanded nodes = {states_explored}\n\n")
-            for matrix in expanded:
-                for row in matrix:
-                    f.write(" ".join(str(x) for x in row) + "\n")
-                f.write("\n")
+        ExpandedLogReader('iddfs.bin').export_text('iddfs.txt')
         
     elif choice == '4':
         # heuristic = input("Choose heuristic (manhattan/euclidean): ")
         while True:
-            heur_choice = input("Choose heuristic (manhattan/euclidean): ").strip().lower()
-            if heur_choice in ('manhattan', 'euclidean'):
+            heur_choice = input(f"Choose heuristic ({'/'.join(HEURISTICS)}): ").strip().lower()
+            if heur_choice in HEURISTICS:
                 break
-            print("Invalid choice. Please enter 'manhattan' or 'euclidean'.")
+            print(f"Invalid choice. Please enter one of {', '.join(HEURISTICS)}.")
         print(f"\n running A* with {heur_choice} heurestic")
         start = time.time()
-        solution, trace, expanded_nodes, max_depth, heuristic_name = astar(initial, goal, heur_choice)
+        with ExpandedLogWriter('a_star.bin', rows, cols) as log:
+            solution, trace, expanded_nodes, max_depth, heuristic_name = run('a_star', lambda: astar(
+                initial, goal, heur_choice, expanded=log, stats=stats))
         end = time.time()
         time_elapsed = end-start
         print_astar_solution(solution, trace, heuristic_name)
         print(f"Execution Time : {time_elapsed}")
         print(f'Max Depth : {max_depth}')
-        with open(f'a_{heuristic_name}.txt','w') as F:
-            for matrix in expanded_nodes:
-                for row in matrix:
-                    for element in row:
-                        F.write(f"{str(element)} ")
-                    F.write("\n")
-                F.write("\n")
+        report_stats('a_star', stats)
+        ExpandedLogReader('a_star.bin').export_text(f'a_{heuristic_name}.txt', header=False)
 
         
         
     elif choice == '5':
+        while True:
+            heur_choice = input(f"Choose heuristic ({'/'.join(HEURISTICS)}): ").strip().lower()
+            if heur_choice in HEURISTICS:
+                break
+            print(f"Invalid choice. Please enter one of {', '.join(HEURISTICS)}.")
+        print(f"\n running IDA* with {heur_choice} heurestic")
+        start = time.time()
+        with ExpandedLogWriter('idastar.bin', rows, cols) as log:
+            solution, trace, expanded_nodes, max_depth, heuristic_name = run('idastar', lambda: IDAstar(
+                initial, goal, heur_choice, expanded=log))
+        end = time.time()
+        time_elapsed = end-start
+        print(f"\nStates expanded: {len(expanded_nodes)}")
+        print_solution(solution)
+        print(f"Execution Time : {time_elapsed}")
+        print(f'Max Depth : {max_depth}')
+        ExpandedLogReader('idastar.bin').export_text(f'idastar_{heuristic_name}.txt')
+
+    elif choice == '6' and rows * cols > ORACLE_MAX_CELLS:
+        print(f"\nThe oracle only covers boards of up to {ORACLE_MAX_CELLS} cells.")
+
+    elif choice == '6':
+        print("\nRunning Oracle...")
+        start = time.time()
+        solution, trace, expanded, depth = run('oracle', lambda: oracle_solve(initial, goal))
+        end = time.time()
+        time_elapsed = end - start
+        print(f"\nOptimal distance: {trace[0]['true_distance']}")
+        print_solution(solution)
+        print(f"Execution Time : {time_elapsed}")
+
+    elif choice == '7':
+        while True:
+            heur_choice = input(f"Choose heuristic ({'/'.join(HEURISTICS)}): ").strip().lower()
+            if heur_choice in HEURISTICS:
+                break
+            print(f"Invalid choice. Please enter one of {', '.join(HEURISTICS)}.")
+        budget = float(input("Time budget in seconds (default 10): ").strip() or 10)
+        weight = float(input("Starting weight (default 3): ").strip() or 3)
+        print(f"\n running ARA* with {heur_choice} heurestic")
+        start = time.time()
+        search = ARAStar(initial, goal, heur_choice, weight)
+
+        def improve():
+            for _, cost, bound in search.improve(budget):
+                print(f"  {time.time() - start:8.3f}s  weight {search.weight:.2f}  cost {cost}  bound {bound:.3f}")
+        run('arastar', improve)
+        end = time.time()
+        time_elapsed = end - start
+        print(f"\nStates expanded: {search.expanded}")
+        print_solution(search.solution)
+        print(f"Suboptimality bound : {search.bound}")
+        print(f"Execution Time : {time_elapsed}")
+
+    elif choice in ('8', '9'):
+        while True:
+            heur_choice = input(f"Choose heuristic ({'/'.join(HEURISTICS)}): ").strip().lower()
+            if heur_choice in HEURISTICS:
+                break
+            print(f"Invalid choice. Please enter one of {', '.join(HEURISTICS)}.")
+        start = time.time()
+        if choice == '8':
+            print(f"\n running greedy best-first with {heur_choice} heurestic")
+            solution, search_stats = run('greedy', lambda: greedy_best_first(initial, goal, heur_choice))
+        else:
+            width = int(input("Beam width (default 1000): ").strip() or 1000)
+            print(f"\n running beam search (width {width}) with {heur_choice} heurestic")
+            solution, search_stats = run('beam', lambda: beam_search(initial, goal, heur_choice, width))
+        end = time.time()
+        time_elapsed = end - start
+        print(f"\nStates expanded: {search_stats['expanded']}")
+        print(f"Peak frontier: {search_stats['peak_frontier']}")
+        print(f"Solution length: {search_stats['solution_length']}")
+        print_solution(solution)
+        print(f"Execution Time : {time_elapsed}")
+
+    elif choice == '10':
+        from autoSolver import auto_solve  # autoSolver imports batch, which imports this module
+        budget = input("Time budget in seconds (default 60, 0 for none): ").strip()
+        budget = float(budget or 60) or None
+        memory_cap = int(float(input("Memory cap in MB (default 512): ").strip() or 512) * (1 << 20))
+        print("\n running auto with auto heurestic")
+        start = time.time()
+        solution, report = run('auto', lambda: auto_solve(initial, goal, 'auto', budget, memory_cap))
+        end = time.time()
+        time_elapsed = end - start
+        estimate = report['estimate']
+        print(f"\nEstimate: {estimate['cells']} cells, {estimate['heuristic']} h = {estimate['h']}")
+        print(f"Plan: {' -> '.join(report['plan'])}")
+        for fallback in report['fallbacks']:
+            print(f"{fallback['engine']} stopped ({fallback['reason']}) after {fallback['expanded']} expansions")
+        print(f"Engine: {report['engine']}")
+        print(f"States expanded: {report['expanded']}")
+        if report['status'] != 'solved':
+            print(f"Stopped: {report['status']}")
+        elif not report['optimal']:
+            print(f"Suboptimal solution: at most {report['bound']:.3f} x optimal"
+                  + (f" (stopped: {report['stopped']})" if report['stopped'] else ''))
+        print_solution(solution)
+        print(f"Execution Time : {time_elapsed}")
+
+    elif choice == '11':
         print("\nExiting...")
     
     else:
@@ -0,0 +1,106 @@
+from array import array
+from packedState import MOVE_NAMES, tile_bits, unpack_board
+from puzzleState import Solution
+
+NO_PARENT = -1
+NO_MOVE = -1
+
+
+class NodeArena:
+    """
+    Search-node store where a node is an index into parallel arrays
+    (packed state, blank index, parent index, move code, g-cost) instead of
+    a Python object holding a board and a parent reference.
+    """
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        # 'Q' holds boards up to 64 bits (4x4); bigger boards fall back to a list of ints
+        self.packed = array('Q') if rows * cols * tile_bits(rows, cols) <= 64 else []
+        self.blank = array('B')
+        self.parent = array('i')
+        self.move = array('b')
+        self.g_cost = array('i')
+
+    def add(self, packed, blank, parent=NO_PARENT, move=NO_MOVE, g_cost=0):
+        """Append a node and return its index."""
+        self.packed.append(packed)
+        self.blank.append(blank)
+        self.parent.append(parent)
+        self.move.append(move)
+        self.g_cost.append(g_cost)
+        return len(self.blank) - 1
+
+    def __len__(self):
+        return len(self.blank)
+
+    def board(self, index):
+        return unpack_board(self.packed[index], self.rows, self.cols)
+
+    def node(self, index):
+        """API-edge view of a node."""
+        return SearchNode(self, index)
+
+    def reconstruct_path(self, index):
+        """Reconstruct the solution path by walking parent indices (a puzzleState.Solution)."""
+        moves = bytearray()
+        while self.parent[index] != NO_PARENT:
+            moves.append(self.move[index])
+            index = self.parent[index]
+        moves.reverse()
+        return Solution(self.board(index), moves)
+
+
+class SearchNode:
+    """Lightweight handle on an arena node, shaped like a PuzzleState."""
+    __slots__ = ('arena', 'index')
+
+    def __init__(self, arena, index):
+        self.arena = arena
+        self.index = index
+
+    @property
+    def board(self):
+        return self.arena.board(self.index)
+
+    @property
+    def parent(self):
+        parent = self.arena.parent[self.index]
+        return None if parent == NO_PARENT else SearchNode(self.arena, parent)
+
+    @property
+    def move(self):
+        move = self.arena.move[self.index]
+        return None if move == NO_MOVE else MOVE_NAMES[move]
+
+    @property
+    def depth(self):
+        return self.arena.g_cost[self.index]
+
+    def to_tuple(self):
+        return self.arena.packed[self.index]
+
+    def __str__(self):
+        return '\n'.join([' '.join(map(str, row)) for row in self.board])
+
+
+class ArenaBoards:
+    """Read-only sequence of the boards of arena nodes [start, stop), built on access."""
+    def __init__(self, arena, start=0, stop=None):
+        self.arena = arena
+        self.start = start
+        self.stop = len(arena) if stop is None else stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('ArenaBoards index out of range')
+        return self.arena.board(self.start + i)
+
+    def __iter__(self):
+        for index in range(self.start, self.stop):
+            yield self.arena.board(index)
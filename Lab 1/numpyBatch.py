@@ -0,0 +1,268 @@
+import argparse
+import time
+from puzzleState import path_from_moves, is_solvable
+from packedState import MOVE_NAMES, move_table, pack_board, tile_bits
+from openList import make_open_list
+
+try:
+    import numpy as np
+except ImportError:  # Optional: only the batch engine needs it
+    np = None
+
+NO_TARGET = -1
+# Heuristics with a vectorised form, by option or heuristics.py name; 'auto' takes the stronger one
+BATCH_HEURISTICS = {
+    'manhattan': 'Manhattan_Distance', 'Manhattan_Distance': 'Manhattan_Distance',
+    'euclidean': 'Euclidean_Distance', 'Euclidean_Distance': 'Euclidean_Distance',
+    'auto': 'Manhattan_Distance',
+}
+
+
+def require_numpy():
+    if np is None:
+        raise ImportError('numpyBatch needs NumPy (pip install numpy)')
+
+
+class BatchEngine:
+    """
+    Vectorised move generation and heuristics for a rows x cols board.
+    A batch is a uint8 array of shape (n_states, rows * cols) holding the tiles in
+    row-major order, plus the blank index of every state. Keys are the states packed
+    into uint64 exactly like packedState.pack_board, so they sort and compare as ints.
+    """
+    def __init__(self, rows, cols, goal_board):
+        require_numpy()
+        self.rows, self.cols = rows, cols
+        self.cells = rows * cols
+        self.bits = tile_bits(rows, cols)
+        if self.cells * self.bits > 64:
+            raise ValueError(f'{rows}x{cols} boards do not fit in 64-bit keys')
+        self.shifts = np.arange(self.cells, dtype=np.uint64) * np.uint64(self.bits)
+
+        # targets[blank, code] is the cell that slides into the blank, NO_TARGET if off the board
+        self.targets = np.full((self.cells, 4), NO_TARGET, dtype=np.int64)
+        for blank, moves in enumerate(move_table(rows, cols)):
+            for code, target, _, _ in moves:
+                self.targets[blank, code] = target
+
+        goal = [value for row in goal_board for value in row]
+        goal_row = np.array([goal.index(tile) // cols for tile in range(self.cells)])
+        goal_col = np.array([goal.index(tile) % cols for tile in range(self.cells)])
+        cell_row, cell_col = np.divmod(np.arange(self.cells), cols)
+        # distance[tile, cell]: contribution of `tile` standing on `cell` (0 for the blank)
+        self.row_offset = np.abs(goal_row[:, None] - cell_row[None, :])
+        self.col_offset = np.abs(goal_col[:, None] - cell_col[None, :])
+        self.row_offset[0] = self.col_offset[0] = 0
+        self.goal_key = self.keys(np.array([goal], dtype=np.uint8))[0]
+
+    def distance_table(self, name):
+        """Per (tile, cell) distances for a BATCH_HEURISTICS value."""
+        if name == 'Manhattan_Distance':
+            return self.row_offset + self.col_offset
+        return np.sqrt(self.row_offset ** 2 + self.col_offset ** 2)
+
+    def heuristic(self, states, table):
+        """Sum of per-tile distances for every state of the batch at once."""
+        return table[states, np.arange(self.cells)].sum(axis=1)
+
+    def keys(self, states):
+        """Pack every state of the batch into one uint64 key."""
+        return (states.astype(np.uint64) << self.shifts).sum(axis=1, dtype=np.uint64)
+
+    def unpack(self, keys):
+        """Inverse of keys(): (states, blanks)."""
+        mask = np.uint64((1 << self.bits) - 1)
+        states = ((keys[:, None] >> self.shifts) & mask).astype(np.uint8)
+        return states, np.argmin(states, axis=1)
+
+    def expand(self, states, blanks):
+        """
+        Every successor of every state in the batch.
+        Returns:
+            (children, child_blanks, parent_index, move_codes) with one row per successor,
+            grouped by parent in Up, Down, Left, Right order
+        """
+        targets = self.targets[blanks]
+        parent_index, codes = np.nonzero(targets != NO_TARGET)
+        child_blanks = targets[parent_index, codes]
+        children = states[parent_index]
+        rows = np.arange(len(children))
+        children[rows, blanks[parent_index]] = children[rows, child_blanks]
+        children[rows, child_blanks] = 0
+        return children, child_blanks, parent_index, codes.astype(np.uint8)
+
+
+def batch_BFS(initialState, goalState=None, max_depth=None, verbose=False):
+    """
+    Layered breadth-first search with each layer held as a sorted uint64 key array.
+    A layer is expanded with one vectorised gather/swap, de-duplicated with np.unique
+    and filtered against the previous layer only: every move is a transposition and
+    flips the permutation parity, so no child lies in its parent's own layer and
+    earlier layers are two or more moves away.
+
+    Args:
+        initialState: PuzzleState/PackedState to search from
+        goalState: state to find, or None to enumerate every reachable state
+        max_depth: stop after this many layers
+        verbose: print each layer's count as it completes
+    Returns:
+        (solution_path, layer_counts) as externalBFS.external_BFS
+    """
+    board = initialState.board
+    rows, cols = len(board), len(board[0])
+    goal_board = goalState.board if goalState is not None else board
+    if not is_solvable(board, goal_board):
+        return None, []
+    engine = BatchEngine(rows, cols, goal_board)
+    start = np.array([[value for row in board for value in row]], dtype=np.uint8)
+    layers = [engine.keys(start)]
+    layer_counts = [1]
+    goal = engine.goal_key if goalState is not None else None
+    found = 0 if goal is not None and layers[0][0] == goal else None
+
+    while found is None and (max_depth is None or len(layers) <= max_depth):
+        started = time.time()
+        states, blanks = engine.unpack(layers[-1])
+        children, _, _, _ = engine.expand(states, blanks)
+        keys = np.unique(engine.keys(children))
+        if len(layers) > 1:
+            keys = keys[~np.isin(keys, layers[-2], assume_unique=True)]
+        if not len(keys):
+            break
+        layers.append(keys)
+        layer_counts.append(len(keys))
+        if goal is None and len(layers) > 3:
+            layers[-4] = None  # Only the last two layers are needed without a goal
+        if verbose:
+            print(f'Depth {len(layers) - 1}: {len(keys)} states ({time.time() - started:.2f}s)')
+        if goal is not None:
+            position = np.searchsorted(keys, goal)
+            if position < len(keys) and keys[position] == goal:
+                found = len(layers) - 1
+
+    if found is None:
+        return None, layer_counts
+    return path_from_moves(initialState, trace_back(engine, layers, goal, found)), layer_counts
+
+
+def trace_back(engine, layers, goal, depth):
+    """Walk from the goal back through the sorted layers; returns the move names."""
+    key, moves = np.array([goal], dtype=np.uint64), []
+    for d in range(depth - 1, -1, -1):
+        states, blanks = engine.unpack(key)
+        parents, _, _, codes = engine.expand(states, blanks)
+        parent_keys = engine.keys(parents)
+        position = np.minimum(np.searchsorted(layers[d], parent_keys), len(layers[d]) - 1)
+        hit = np.flatnonzero(layers[d][position] == parent_keys)[0]
+        moves.append(MOVE_NAMES[codes[hit] ^ 1])  # The parent's blank moved the other way
+        key = parent_keys[hit:hit + 1]
+    moves.reverse()
+    return moves
+
+
+def batch_astar(initial_state, goal_state, heuristic='manhattan', batch_size=256):
+    """
+    A* that pops up to batch_size best open nodes at a time and expands them together:
+    successors, their keys and their heuristic values are computed for the whole
+    batch in a few NumPy operations. Duplicates inside a batch are merged with
+    np.unique (keeping the smallest g); the rest go through the usual g-value table.
+    Popping several nodes per round can expand nodes that plain A* would not, so the
+    search only stops once no open node has f below the best goal cost found.
+
+    Args:
+        initial_state: PuzzleState/PackedState representing the start
+        goal_state: PuzzleState/PackedState representing the goal
+        heuristic: 'manhattan', 'euclidean' or 'auto' (Manhattan), or the matching
+            heuristics.py object
+        batch_size: nodes expanded per round
+    Returns:
+        (solution_path, stats) with stats keys 'expanded', 'generated', 'batches',
+        'solution_length' and 'heuristic'
+    """
+    name = BATCH_HEURISTICS.get(getattr(heuristic, 'name', heuristic))
+    if name is None:
+        raise ValueError(f"No batch form of heuristic '{heuristic}'. Choose from manhattan, euclidean, auto")
+    board, goal_board = initial_state.board, goal_state.board
+    rows, cols = len(goal_board), len(goal_board[0])
+    engine = BatchEngine(rows, cols, goal_board)
+    table = engine.distance_table(name)
+    stats = {'expanded': 0, 'generated': 1, 'batches': 0, 'solution_length': None, 'heuristic': name}
+    if not is_solvable(board, goal_board):
+        return None, stats
+
+    start, _ = pack_board(board)
+    goal = int(engine.goal_key)
+    start_h = engine.heuristic(np.array([[v for row in board for v in row]], dtype=np.uint8), table)[0]
+    open_list = make_open_list(None, name == 'Manhattan_Distance')
+    open_list.push((start, 0, start_h), start_h, 0)
+    g_values = {start: 0}
+    parents = {start: None}  # key -> (parent key, move code)
+    best = 0 if start == goal else None
+
+    done = False
+    while open_list and not done:
+        batch, g_batch = [], []
+        while open_list and len(batch) < batch_size:
+            key, g, f = open_list.pop()
+            if g_values[key] != g:
+                continue  # Stale: reached again with a smaller g
+            if best is not None and f >= best:
+                done = True  # Nothing left can improve the incumbent
+                break
+            batch.append(key)
+            g_batch.append(g)
+        if not batch:
+            break
+        stats['batches'] += 1
+        stats['expanded'] += len(batch)
+
+        states, blanks = engine.unpack(np.array(batch, dtype=np.uint64))
+        children, _, parent_index, codes = engine.expand(states, blanks)
+        child_g = np.array(g_batch)[parent_index] + 1
+        child_keys = engine.keys(children)
+        order = np.lexsort((child_g, child_keys))  # By key, then smallest g first
+        _, first = np.unique(child_keys[order], return_index=True)
+        chosen = order[first]
+        child_h = engine.heuristic(children[chosen], table)
+        stats['generated'] += len(chosen)
+
+        for key, g, h, parent, code in zip(child_keys[chosen].tolist(), child_g[chosen].tolist(),
+                                            child_h.tolist(), parent_index[chosen].tolist(),
+                                            codes[chosen].tolist()):
+            known = g_values.get(key)
+            if known is not None and known <= g:
+                continue
+            g_values[key] = g
+            parents[key] = (batch[parent], code)
+            if key == goal:
+                if best is None or g < best:
+                    best = g
+                continue
+            if best is None or g + h < best:
+                open_list.push((key, g, g + h), g + h, g)
+
+    if best is None:
+        return None, stats
+    moves, key = [], goal
+    while parents[key] is not None:
+        key, code = parents[key]
+        moves.append(MOVE_NAMES[code])
+    moves.reverse()
+    stats['solution_length'] = len(moves)
+    return path_from_moves(initial_state, moves), stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Count states per depth with the NumPy batch BFS')
+    parser.add_argument('rows', type=int)
+    parser.add_argument('cols', type=int)
+    parser.add_argument('--start', help='comma-separated start state (default 0,1,2,...)')
+    parser.add_argument('--max-depth', type=int, default=None)
+    args = parser.parse_args()
+    from packedState import PackedState
+    values = ([int(x) for x in args.start.split(',')] if args.start
+              else list(range(args.rows * args.cols)))
+    board = [values[i * args.cols:(i + 1) * args.cols] for i in range(args.rows)]
+    begin = time.time()
+    _, counts = batch_BFS(PackedState.from_board(board), None, args.max_depth, verbose=True)
+    print(f'{sum(counts)} states in {len(counts)} layers, {time.time() - begin:.1f}s')
@@ -0,0 +1,86 @@
+import heapq
+import itertools
+
+
+class BucketOpenList:
+    """
+    Two-level bucket queue for integer f and g: buckets[f][g] is a LIFO list.
+    pop() returns an item with the smallest f, preferring the largest g
+    (equivalently the smallest h) among f-ties. Push and pop are amortised O(1).
+    Decrease-key is left to the caller: push the improved entry and skip stale
+    ones when they come out.
+    """
+    def __init__(self):
+        self.buckets = []
+        self.min_f = 0
+        self.size = 0
+
+    def push(self, item, f, g):
+        buckets = self.buckets
+        while len(buckets) <= f:
+            buckets.append([])
+        by_g = buckets[f]
+        while len(by_g) <= g:
+            by_g.append([])
+        by_g[g].append(item)
+        self.size += 1
+        if f < self.min_f:
+            self.min_f = f
+
+    def pop(self):
+        if not self.size:
+            raise IndexError('pop from empty open list')
+        buckets = self.buckets
+        f = self.min_f
+        while True:
+            by_g = buckets[f]
+            while by_g and not by_g[-1]:
+                by_g.pop()
+            if by_g:
+                break
+            f += 1
+        self.min_f = f
+        self.size -= 1
+        return by_g[-1].pop()
+
+    def __len__(self):
+        return self.size
+
+
+class HeapOpenList:
+    """
+    Binary-heap open list with the same interface and tie-breaking as
+    BucketOpenList; works for any comparable f (e.g. the float Euclidean heuristic).
+    """
+    def __init__(self):
+        self.heap = []
+        self.counter = itertools.count()  # FIFO among equal (f, g), never compares items
+
+    def push(self, item, f, g):
+        heapq.heappush(self.heap, (f, -g, next(self.counter), item))
+
+    def pop(self):
+        return heapq.heappop(self.heap)[-1]
+
+    def __len__(self):
+        return len(self.heap)
+
+
+OPEN_LISTS = {'bucket': BucketOpenList, 'heap': HeapOpenList}
+
+
+def make_open_list(open_list, integer):
+    """
+    Resolve an open_list option.
+    Args:
+        open_list: 'bucket', 'heap', or None to pick buckets for integer heuristics
+                   and the heap otherwise
+        integer: whether the heuristic only produces integer values
+    """
+    if open_list is None:
+        open_list = 'bucket' if integer else 'heap'
+    if open_list not in OPEN_LISTS:
+        raise ValueError(f"Unknown open list '{open_list}'. Choose from {', '.join(OPEN_LISTS)}")
+    if open_list == 'bucket' and not integer:
+        raise ValueError('The bucket open list needs an integer-valued heuristic')
+    return OPEN_LISTS[open_list]()
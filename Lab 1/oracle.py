@@ -0,0 +1,174 @@
+import mmap
+import os
+import struct
+import time
+from math import factorial
+from puzzleState import path_from_moves
+from packedState import MOVE_NAMES, move_table
+from heuristics import state_tiles
+from patternDatabase import PDB_DIR, rank_positions
+
+MAGIC = b'ORC1'
+UNREACHABLE = 255
+MAX_CELLS = 9  # 9! = 362,880 one-byte entries
+
+_oracles = {}
+
+
+def permutation_rank(tiles):
+    """Lehmer-code rank of a full permutation of range(len(tiles))."""
+    return rank_positions(tiles, len(tiles))
+
+
+def permutation_unrank(rank, n):
+    """Inverse of permutation_rank."""
+    digits = []
+    for base in range(1, n + 1):
+        rank, digit = divmod(rank, base)
+        digits.append(digit)
+    available = list(range(n))
+    return [available.pop(digit) for digit in reversed(digits)]
+
+
+def build_distance_table(rows, cols, blank_label):
+    """
+    Backward BFS from the identity arrangement (label i on cell i, the blank
+    carrying blank_label) over all permutations, storing the depth of each state
+    at its permutation rank. Unreachable ranks keep UNREACHABLE.
+    """
+    n = rows * cols
+    table = bytearray([UNREACHABLE]) * factorial(n)
+    moves = move_table(rows, cols)
+    start = list(range(n))
+    table[permutation_rank(start)] = 0
+    layer = [(start, blank_label)]
+    depth = 0
+    while layer:
+        depth += 1
+        next_layer = []
+        for tiles, blank in layer:
+            for _, target, _, _ in moves[blank]:
+                child = tiles[:]
+                child[blank], child[target] = child[target], child[blank]
+                rank = permutation_rank(child)
+                if table[rank] == UNREACHABLE:
+                    table[rank] = depth
+                    next_layer.append((child, target))
+        layer = next_layer
+    return table
+
+
+def oracle_path(rows, cols, blank_label):
+    return os.path.join(PDB_DIR, f'oracle_{rows}x{cols}_b{blank_label}.bin')
+
+
+def load_distance_table(rows, cols, blank_label, verbose=False):
+    """Memory-map the distance table, building and saving it on first use."""
+    path = oracle_path(rows, cols, blank_label)
+    if not os.path.exists(path):
+        start = time.time()
+        table = build_distance_table(rows, cols, blank_label)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(MAGIC + struct.pack('<BBB', rows, cols, blank_label))
+            f.write(table)
+        os.replace(path + '.tmp', path)
+        if verbose:
+            print(f'Built {path} ({len(table)} entries) in {time.time() - start:.1f}s')
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if data[:4] != MAGIC or tuple(data[4:7]) != (rows, cols, blank_label):
+        raise ValueError(f'{path} is not a distance table for {rows}x{cols} with blank label {blank_label}')
+    return memoryview(data)[7:]
+
+
+class DistanceOracle:
+    """
+    O(1) optimal distance lookup to a fixed goal. Tiles are relabelled by their goal
+    cell, so one table per (shape, goal blank cell) serves every goal permutation.
+    """
+    def __init__(self, goal_board):
+        self.rows, self.cols = len(goal_board), len(goal_board[0])
+        if self.rows * self.cols > MAX_CELLS:
+            raise ValueError(f'Distance oracle supports boards of up to {MAX_CELLS} cells')
+        goal_tiles = [value for row in goal_board for value in row]
+        self.label = [0] * len(goal_tiles)
+        for index, tile in enumerate(goal_tiles):
+            self.label[tile] = index
+        self.table = load_distance_table(self.rows, self.cols, self.label[0])
+        self.moves = move_table(self.rows, self.cols)
+
+    def tiles_distance(self, tiles):
+        value = self.table[permutation_rank([self.label[tile] for tile in tiles])]
+        return float('inf') if value == UNREACHABLE else value
+
+    def distance(self, state):
+        """Optimal number of moves from state to the goal (inf if unsolvable)."""
+        return self.tiles_distance(state_tiles(state))
+
+    def states_at(self, distance):
+        """Every board (flat tile list) exactly `distance` moves from the goal."""
+        goal_tiles = [0] * len(self.label)
+        for tile, label in enumerate(self.label):
+            goal_tiles[label] = tile
+        n = len(goal_tiles)
+        return [[goal_tiles[label] for label in permutation_unrank(rank, n)]
+                for rank, value in enumerate(self.table) if value == distance]
+
+    def solve_moves(self, state):
+        """Optimal move names by greedy descent: always step to a neighbor one closer."""
+        tiles = [self.label[tile] for tile in state_tiles(state)]
+        distance = self.table[permutation_rank(tiles)]
+        if distance == UNREACHABLE:
+            return None
+        blank = tiles.index(self.label[0])
+        moves = []
+        while distance:
+            for code, target, _, _ in self.moves[blank]:
+                tiles[blank], tiles[target] = tiles[target], tiles[blank]
+                if self.table[permutation_rank(tiles)] == distance - 1:
+                    moves.append(MOVE_NAMES[code])
+                    blank = target
+                    distance -= 1
+                    break
+                tiles[blank], tiles[target] = tiles[target], tiles[blank]
+        return moves
+
+
+def get_oracle(goal_board):
+    """Cached DistanceOracle for goal_board."""
+    key = tuple(value for row in goal_board for value in row)
+    if key not in _oracles:
+        _oracles[key] = DistanceOracle(goal_board)
+    return _oracles[key]
+
+
+def oracle_solve(initialState, goalState):
+    """
+    Solve by table lookup and greedy descent (boards of up to 9 cells).
+    Returns:
+        (solution_path, trace_data, expanded_nodes, max_depth) like BFS, where
+        expanded_nodes are the boards visited along the descent
+    """
+    oracle = get_oracle(goalState.board)
+    distance = oracle.distance(initialState)
+    trace_data = [{
+        'step': 0,
+        'action': 'lookup',
+        'current_state': initialState.board,
+        'true_distance': distance,
+        'explored_size': 0,
+        'message': f'Oracle distance {distance}'
+    }]
+    moves = oracle.solve_moves(initialState)
+    if moves is None:
+        trace_data.append({'step': 1, 'action': 'failed', 'message': 'Goal not reachable - no solution exists'})
+        return None, trace_data, [], 0
+    solution_path = path_from_moves(initialState, moves)
+    trace_data.append({
+        'step': 1,
+        'action': 'goal_found',
+        'solution_length': len(solution_path),
+        'message': f'Goal found! Solution has {len(solution_path)} moves'
+    })
+    return solution_path, trace_data, [step['board'] for step in solution_path], len(moves)
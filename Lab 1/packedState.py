@@ -0,0 +1,137 @@
+MOVE_NAMES = ('Up', 'Down', 'Left', 'Right')
+MOVE_DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+_move_tables = {}
+
+
+def tile_bits(rows, cols):
+    """Number of bits used per tile (4 bits fit every tile of a 4x4 board)."""
+    return max(4, (rows * cols - 1).bit_length())
+
+
+def move_table(rows, cols):
+    """
+    Precomputed moves for every blank position of a rows x cols board.
+    Returns:
+        list indexed by blank index of [(move_code, target_index, target_shift, blank_shift), ...]
+        in Up, Down, Left, Right order (the same order as PuzzleState.get_neighbors).
+    """
+    key = (rows, cols)
+    table = _move_tables.get(key)
+    if table is None:
+        bits = tile_bits(rows, cols)
+        table = []
+        for blank in range(rows * cols):
+            row, col = divmod(blank, cols)
+            moves = []
+            for code, (dr, dc) in enumerate(MOVE_DELTAS):
+                new_row, new_col = row + dr, col + dc
+                if 0 <= new_row < rows and 0 <= new_col < cols:
+                    target = new_row * cols + new_col
+                    moves.append((code, target, target * bits, blank * bits))
+            table.append(tuple(moves))
+        table = tuple(table)
+        _move_tables[key] = table
+    return table
+
+
+def pack_board(board):
+    """Pack a 2D board into (packed_int, blank_index)."""
+    rows, cols = len(board), len(board[0])
+    bits = tile_bits(rows, cols)
+    packed = 0
+    blank = None
+    index = 0
+    for row in board:
+        for value in row:
+            packed |= value << (index * bits)
+            if value == 0:
+                blank = index
+            index += 1
+    return packed, blank
+
+
+def unpack_board(packed, rows, cols):
+    """Unpack a packed integer back into a 2D board."""
+    bits = tile_bits(rows, cols)
+    mask = (1 << bits) - 1
+    board = []
+    for i in range(rows):
+        row = []
+        for j in range(cols):
+            row.append((packed >> ((i * cols + j) * bits)) & mask)
+        board.append(row)
+    return board
+
+
+class PackedState:
+    """
+    Drop-in alternative to PuzzleState that stores the board as a single integer
+    (4 bits per tile for boards up to 4x4) plus the blank index.
+    to_tuple() returns the packed integer itself, so the solvers' explored/frontier
+    sets hash one int instead of a tuple of tuples.
+    """
+    __slots__ = ('packed', 'blank', 'rows', 'cols', 'parent', 'move', 'depth', 'cost')
+
+    def __init__(self, packed, blank, rows, cols, parent=None, move=None, depth=0, cost=0):
+        self.packed = packed
+        self.blank = blank
+        self.rows = rows
+        self.cols = cols
+        self.parent = parent
+        self.move = move  # Move that led to this state
+        self.depth = depth
+        self.cost = cost  # For UCS, A*
+
+    @classmethod
+    def from_board(cls, board):
+        """Build a PackedState from a 2D list board."""
+        packed, blank = pack_board(board)
+        return cls(packed, blank, len(board), len(board[0]))
+
+    @property
+    def board(self):
+        """2D list view of the board (built on demand)."""
+        return unpack_board(self.packed, self.rows, self.cols)
+
+    @property
+    def blank_pos(self):
+        return divmod(self.blank, self.cols)
+
+    def find_blank(self):
+        """Position of the blank (0) tile as (row, col)."""
+        return self.blank_pos
+
+    def get_neighbors(self):
+        """Generate all valid neighbor states from the precomputed move table."""
+        neighbors = []
+        packed = self.packed
+        mask = (1 << tile_bits(self.rows, self.cols)) - 1
+        depth = self.depth + 1
+        cost = self.cost + 1  # Each move costs 1
+        for code, target, target_shift, blank_shift in move_table(self.rows, self.cols)[self.blank]:
+            # Slide the tile at target into the blank; the blank's nibble is already 0
+            tile = (packed >> target_shift) & mask
+            new_packed = packed - (tile << target_shift) + (tile << blank_shift)
+            neighbors.append(PackedState(
+                new_packed, target, self.rows, self.cols,
+                self, MOVE_NAMES[code], depth, cost
+            ))
+        return neighbors
+
+    def to_tuple(self):
+        """Hashable key for the board (the packed integer)."""
+        return self.packed
+
+    def __eq__(self, other):
+        if isinstance(other, PackedState):
+            return self.packed == other.packed
+        if hasattr(other, 'board'):  # e.g. a PuzzleState goal: compare boards, as PuzzleState does
+            return self.board == other.board
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.packed)
+
+    def __str__(self):
+        return '\n'.join([' '.join(map(str, row)) for row in self.board])
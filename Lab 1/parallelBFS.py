@@ -0,0 +1,150 @@
+import argparse
+import multiprocessing
+import time
+from array import array
+from multiprocessing import shared_memory
+from packedState import move_table
+from patternDatabase import permutation_count, rank_positions, unrank_positions
+
+NO_MOVE = 255
+
+# Worker-side view of the visited bitmap, attached once per process
+_shared = {}
+
+
+def attach_bitmap(name):
+    """Pool initializer: map the visited bitmap created by the parent."""
+    _shared['memory'] = shared_memory.SharedMemory(name=name)
+    _shared['bitmap'] = _shared['memory'].buf
+
+
+def expand_chunk(task):
+    """
+    Expand a chunk of ranks of one layer.
+    A rank encodes the cells of (blank, *pattern tiles); children already marked in the
+    visited bitmap are dropped here, the rest are returned for the parent to merge.
+    Args:
+        task: (ranks as array('Q') bytes, rows, cols, k)
+    Returns:
+        (child ranks as array('Q') bytes, move codes as bytes), in expansion order
+    """
+    data, rows, cols, k = task
+    n = rows * cols
+    table = move_table(rows, cols)
+    bitmap = _shared['bitmap']
+    ranks = array('Q')
+    ranks.frombytes(data)
+    children, moves = array('Q'), bytearray()
+    for rank in ranks:
+        positions = unrank_positions(rank, n, k)
+        blank = positions[0]
+        for code, target, _, _ in table[blank]:
+            child = positions[:]
+            child[0] = target
+            if target in positions:
+                child[positions.index(target)] = blank
+            child_rank = rank_positions(child, n)
+            if not bitmap[child_rank >> 3] & (1 << (child_rank & 7)):
+                children.append(child_rank)
+                moves.append(code)
+    return children.tobytes(), bytes(moves)
+
+
+def layered_BFS(start_board, pattern=None, workers=None, chunk_size=4096, verbose=False):
+    """
+    Layer-synchronous BFS sweep over the (abstract) state space reachable from
+    start_board. A state is the cells of the blank and of the `pattern` tiles
+    (all tiles by default, i.e. the full permutation), ranked with rank_positions.
+    Visited states live in a shared-memory bitmap indexed by rank. Each layer is
+    cut into chunks that a process pool expands against the bitmap. The parent then
+    merges the chunks in order, so the histogram and the parent moves are identical
+    for any number of workers. workers=0 expands in-process (the sequential reference).
+
+    Args:
+        start_board: 2D board the sweep starts from (usually the goal)
+        pattern: tiles to distinguish; others are interchangeable (default: all)
+        workers: pool size (default: CPU count); 0 for sequential
+        chunk_size: ranks per task
+        verbose: print every layer
+    Returns:
+        (layer_counts, moves) where moves[rank] is the code of the move that first
+        reached that state (packedState.MOVE_NAMES order), NO_MOVE for the start
+        and for unreached states
+    """
+    rows, cols = len(start_board), len(start_board[0])
+    n = rows * cols
+    flat = [value for row in start_board for value in row]
+    if pattern is None:
+        pattern = [tile for tile in flat if tile != 0]
+    k = len(pattern) + 1
+    size = permutation_count(n, k)
+    start = rank_positions([flat.index(0)] + [flat.index(tile) for tile in pattern], n)
+
+    memory = shared_memory.SharedMemory(create=True, size=(size + 7) // 8)
+    bitmap = memory.buf
+    bitmap[:] = bytes(len(bitmap))
+    moves = bytearray([NO_MOVE]) * size
+    pool = None
+    try:
+        if workers == 0:
+            _shared.update(memory=memory, bitmap=bitmap)
+            run = map
+        else:
+            context = multiprocessing.get_context('fork')
+            pool = context.Pool(workers or multiprocessing.cpu_count(), attach_bitmap, (memory.name,))
+            run = pool.imap  # Ordered, so merging is deterministic
+
+        bitmap[start >> 3] |= 1 << (start & 7)
+        layer = array('Q', [start])
+        layer_counts = [1]
+        while layer:
+            started = time.time()
+            tasks = [(layer[i:i + chunk_size].tobytes(), rows, cols, k) for i in range(0, len(layer), chunk_size)]
+            next_layer = array('Q')
+            for data, codes in run(expand_chunk, tasks):
+                children = array('Q')
+                children.frombytes(data)
+                for rank, code in zip(children, codes):
+                    byte, bit = rank >> 3, 1 << (rank & 7)
+                    if not bitmap[byte] & bit:
+                        bitmap[byte] |= bit
+                        moves[rank] = code
+                        next_layer.append(rank)
+            layer = next_layer
+            if layer:
+                layer_counts.append(len(layer))
+                if verbose:
+                    print(f'Depth {len(layer_counts) - 1}: {len(layer)} states ({time.time() - started:.2f}s)')
+        return layer_counts, moves
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        _shared.clear()
+        del bitmap
+        memory.close()
+        memory.unlink()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Parallel layer-synchronous BFS sweep')
+    parser.add_argument('rows', type=int)
+    parser.add_argument('cols', type=int)
+    parser.add_argument('--goal', help='comma-separated start/goal state (default 0,1,2,...)')
+    parser.add_argument('--pattern', help='comma-separated tiles to distinguish (default: all)')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='pool size (0: sequential)')
+    parser.add_argument('--chunk', type=int, default=4096, help='ranks per task')
+    parser.add_argument('--verify', action='store_true', help='also run sequentially and compare')
+    args = parser.parse_args()
+    values = ([int(x) for x in args.goal.split(',')] if args.goal
+              else list(range(args.rows * args.cols)))
+    board = [values[i * args.cols:(i + 1) * args.cols] for i in range(args.rows)]
+    pattern = [int(x) for x in args.pattern.split(',')] if args.pattern else None
+    begin = time.time()
+    counts, moves = layered_BFS(board, pattern, args.workers, args.chunk, verbose=True)
+    print(f'{sum(counts)} states in {len(counts)} layers, {time.time() - begin:.1f}s')
+    if args.verify:
+        begin = time.time()
+        expected_counts, expected_moves = layered_BFS(board, pattern, 0, args.chunk)
+        same = counts == expected_counts and moves == expected_moves
+        print(f"Sequential run {time.time() - begin:.1f}s: {'identical' if same else 'MISMATCH'}")
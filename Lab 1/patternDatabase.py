@@ -0,0 +1,287 @@
+import argparse
+import mmap
+import os
+import struct
+import time
+from heuristics import moved_tile, state_tiles
+
+MAGIC = b'PDB1'
+UNSEEN = 255
+PDB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdb')
+
+# Partition sizes over the goal's tiles in row-major order. The build keeps a
+# visited byte per (rank, blank) pair, n!/(n-k)! * n bytes for a k-tile group, so
+# groups stop at 6 tiles on 4x4 (92 MB; an 8-tile group would need 8.3 GB).
+PARTITIONS = {
+    (3, 3): {'8': (8,)},
+    (4, 4): {'5-5-5': (5, 5, 5), '6-6-3': (6, 6, 3)},
+}
+
+_loaded = {}
+
+
+def default_partition(rows, cols):
+    """Full table for boards of up to 9 cells, otherwise disjoint groups of at most 5 tiles."""
+    tiles = rows * cols - 1
+    if tiles <= 8:
+        return (tiles,)
+    if (rows, cols) == (4, 4):
+        return PARTITIONS[(4, 4)]['5-5-5']
+    return tuple(min(5, tiles - start) for start in range(0, tiles, 5))
+
+
+def parse_partition(partition, rows, cols):
+    """Accept None, a name like '6-6-3' or a tuple of group sizes."""
+    if partition is None:
+        return default_partition(rows, cols)
+    if isinstance(partition, str):
+        partition = tuple(int(size) for size in partition.split('-'))
+    if sum(partition) != rows * cols - 1:
+        raise ValueError(f"Partition {partition} does not cover the {rows * cols - 1} tiles of a {rows}x{cols} board")
+    return tuple(partition)
+
+
+def pattern_groups(goal_board, partition):
+    """Split the goal's non-blank tiles (row-major) into groups of the partition sizes."""
+    tiles = [value for row in goal_board for value in row if value != 0]
+    groups = []
+    start = 0
+    for size in partition:
+        groups.append(tuple(tiles[start:start + size]))
+        start += size
+    return groups
+
+
+def permutation_count(n, k):
+    count = 1
+    for i in range(k):
+        count *= n - i
+    return count
+
+
+def rank_positions(positions, n):
+    """Rank k distinct cell indices out of n into [0, n!/(n-k)!)."""
+    rank = 0
+    used = 0
+    for i, position in enumerate(positions):
+        rank = rank * (n - i) + position - (used & ((1 << position) - 1)).bit_count()
+        used |= 1 << position
+    return rank
+
+
+def unrank_positions(rank, n, k):
+    """Inverse of rank_positions for k positions out of n."""
+    digits = [0] * k
+    for i in range(k - 1, -1, -1):
+        rank, digits[i] = divmod(rank, n - i)
+    available = list(range(n))
+    return [available.pop(digit) for digit in digits]
+
+
+def adjacency(rows, cols):
+    cells = []
+    for index in range(rows * cols):
+        row, col = divmod(index, cols)
+        cells.append(tuple(r * cols + c for r, c in
+                           ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1))
+                           if 0 <= r < rows and 0 <= c < cols))
+    return cells
+
+
+def build_pattern_table(goal_board, tiles):
+    """
+    Backward breadth-first search from the goal in the abstract space where only
+    `tiles` are distinguishable. Only moves of pattern tiles are counted (blank moves
+    through non-pattern cells are free), so tables of disjoint groups are additive.
+    Returns:
+        bytearray indexed by rank_positions(pattern tile positions)
+    """
+    rows, cols = len(goal_board), len(goal_board[0])
+    n = rows * cols
+    flat_goal = [value for row in goal_board for value in row]
+    neighbors = adjacency(rows, cols)
+    start = tuple(flat_goal.index(tile) for tile in tiles)
+    table = bytearray([UNSEEN]) * permutation_count(n, len(tiles))
+    visited = bytearray(len(table) * n)  # (rank, blank) pairs already flooded
+
+    layer = [(start, flat_goal.index(0), rank_positions(start, n))]
+    depth = 0
+    while layer:
+        next_layer = []
+        for positions, blank, rank in layer:
+            base = rank * n
+            if visited[base + blank]:
+                continue
+            if table[rank] == UNSEEN:
+                table[rank] = depth
+            occupied = [-1] * n
+            for i, position in enumerate(positions):
+                occupied[position] = i
+            # Free moves: flood the blank through the cells not held by pattern tiles
+            visited[base + blank] = 1
+            region = [blank]
+            for cell in region:
+                for neighbor in neighbors[cell]:
+                    if occupied[neighbor] < 0 and not visited[base + neighbor]:
+                        visited[base + neighbor] = 1
+                        region.append(neighbor)
+            # Counted moves: a pattern tile slides into the blank
+            for cell in region:
+                for neighbor in neighbors[cell]:
+                    i = occupied[neighbor]
+                    if i >= 0:
+                        new_positions = positions[:i] + (cell,) + positions[i + 1:]
+                        new_rank = rank_positions(new_positions, n)
+                        if not visited[new_rank * n + neighbor]:
+                            next_layer.append((new_positions, neighbor, new_rank))
+        layer = next_layer
+        depth += 1
+    return table
+
+
+def pdb_path(goal_board, partition):
+    rows, cols = len(goal_board), len(goal_board[0])
+    goal = '.'.join(str(value) for row in goal_board for value in row)
+    name = '-'.join(str(size) for size in partition)
+    return os.path.join(PDB_DIR, f'pdb_{rows}x{cols}_{goal}_{name}.bin')
+
+
+def save_pattern_database(path, goal_board, groups, tables):
+    """
+    Binary layout: MAGIC, rows, cols, group count, goal tiles (one byte each),
+    then per group: size byte, tile bytes, uint32 table length, followed by all tables.
+    """
+    rows, cols = len(goal_board), len(goal_board[0])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(MAGIC + struct.pack('<BBB', rows, cols, len(groups)))
+        f.write(bytes(value for row in goal_board for value in row))
+        for tiles, table in zip(groups, tables):
+            f.write(struct.pack('<B', len(tiles)) + bytes(tiles) + struct.pack('<I', len(table)))
+        for table in tables:
+            f.write(table)
+    os.replace(path + '.tmp', path)
+
+
+def load_pattern_database(path):
+    """
+    Memory-map a saved pattern database.
+    Returns:
+        (rows, cols, goal_tiles, groups, tables) with tables as memoryview slices of the map
+    """
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if data[:4] != MAGIC:
+        raise ValueError(f'{path} is not a pattern database file')
+    rows, cols, count = struct.unpack_from('<BBB', data, 4)
+    offset = 7
+    goal_tiles = tuple(data[offset:offset + rows * cols])
+    offset += rows * cols
+    groups, lengths = [], []
+    for _ in range(count):
+        size = data[offset]
+        groups.append(tuple(data[offset + 1:offset + 1 + size]))
+        lengths.append(struct.unpack_from('<I', data, offset + 1 + size)[0])
+        offset += 5 + size
+    view = memoryview(data)
+    tables = []
+    for length in lengths:
+        tables.append(view[offset:offset + length])
+        offset += length
+    return rows, cols, goal_tiles, groups, tables
+
+
+def pattern_database(goal_board, partition=None, verbose=False):
+    """Load the tables for goal_board/partition, building and saving them on first use."""
+    rows, cols = len(goal_board), len(goal_board[0])
+    partition = parse_partition(partition, rows, cols)
+    path = pdb_path(goal_board, partition)
+    if path in _loaded:
+        return _loaded[path]
+    if not os.path.exists(path):
+        groups = pattern_groups(goal_board, partition)
+        tables = []
+        for tiles in groups:
+            start = time.time()
+            tables.append(build_pattern_table(goal_board, tiles))
+            if verbose:
+                print(f'Built pattern {tiles}: {len(tables[-1])} entries in {time.time() - start:.1f}s')
+        save_pattern_database(path, goal_board, groups, tables)
+    _loaded[path] = load_pattern_database(path)
+    return _loaded[path]
+
+
+class PatternDatabaseHeuristic:
+    """
+    Additive disjoint pattern databases: h = sum over groups of the table value for
+    the positions of that group's tiles. A move only changes the group holding the
+    moved tile, so child() re-ranks that single group.
+    """
+    name = 'Pattern_Database'
+    integer = True
+
+    def __init__(self, goal_board, debug=False, partition=None):
+        self.rows, self.cols = len(goal_board), len(goal_board[0])
+        self.debug = debug
+        _, _, _, self.groups, self.tables = pattern_database(goal_board, partition)
+        self.n = self.rows * self.cols
+        self.group_of = {}
+        for g, tiles in enumerate(self.groups):
+            for tile in tiles:
+                self.group_of[tile] = g
+
+    def evaluate_tiles(self, tiles):
+        """Full evaluation of a flat row-major tile list."""
+        where = [0] * self.n
+        for index, tile in enumerate(tiles):
+            where[tile] = index
+        h = 0
+        for group, table in zip(self.groups, self.tables):
+            h += table[rank_positions([where[tile] for tile in group], self.n)]
+        return h
+
+    def __call__(self, board):
+        return self.evaluate_tiles([value for row in board for value in row])
+
+    def update_tiles(self, h, tiles, tile, src, dst, where=None):
+        """
+        Update h after tile slid from src to dst; tiles is the board after the move.
+        where (tile -> cell after the move), when the search keeps one, saves
+        locating the group's tiles in the board.
+        """
+        g = self.group_of[tile]
+        group = self.groups[g]
+        if where is None:
+            where = [0] * self.n
+            for index, value in enumerate(tiles):
+                where[value] = index
+        positions = [where[t] for t in group]
+        before = [src if t == tile else position for t, position in zip(group, positions)]
+        table = self.tables[g]
+        return h - table[rank_positions(before, self.n)] + table[rank_positions(positions, self.n)]
+
+    def child(self, parent, h, child):
+        tile, src, dst = moved_tile(parent, child)
+        tiles = state_tiles(child)
+        value = self.update_tiles(h, tiles, tile, src, dst)
+        if self.debug:
+            expected = self.evaluate_tiles(tiles)
+            if value != expected:
+                raise AssertionError(f'{self.name}: incremental value {value} != full recompute {expected}')
+        return value
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build additive pattern databases for the sliding puzzle')
+    parser.add_argument('rows', type=int)
+    parser.add_argument('cols', type=int)
+    parser.add_argument('--partition', help="group sizes, e.g. '6-6-3' (default: full table up to 3x3, 5-5-5 on 4x4)")
+    parser.add_argument('--goal', help='comma-separated goal (default 0,1,2,...)')
+    args = parser.parse_args()
+    values = ([int(x) for x in args.goal.split(',')] if args.goal
+              else list(range(args.rows * args.cols)))
+    goal = [values[i * args.cols:(i + 1) * args.cols] for i in range(args.rows)]
+    start = time.time()
+    pattern_database(goal, args.partition, verbose=True)
+    print(f'Saved {pdb_path(goal, parse_partition(args.partition, args.rows, args.cols))} '
+          f'in {time.time() - start:.1f}s')
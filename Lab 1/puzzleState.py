@@ -1,6 +1,8 @@
-import copy
+from packedState import MOVE_NAMES, MOVE_DELTAS
 
 class PuzzleState:
+    __slots__ = ('board', 'parent', 'move', 'depth', 'cost', 'blank_pos')
+
     def __init__(self, board, parent=None, move=None, depth=0, cost=0):
         self.board = board  # 2D list representing the puzzle
         self.parent = parent
@@ -61,25 +63,118 @@ class PuzzleState:
         return '\n'.join([' '.join(map(str, row)) for row in self.board])
 
 
+class Solution:
+    """
+    Compact solution path: the start board plus one byte per move
+    (packedState.MOVE_NAMES codes). Reads like the list of
+    {'move', 'board', 'depth'} steps that reconstruct_path used to build, but a
+    step's board is only built when it is iterated or indexed.
+    to_list() returns that list for code that needs a real one; the first
+    index or slice builds it once and later ones reuse it.
+    """
+    __slots__ = ('start', 'rows', 'cols', 'moves', 'step_list')
+
+    def __init__(self, start_board, moves=b''):
+        self.rows, self.cols = len(start_board), len(start_board[0])
+        self.start = tuple(value for row in start_board for value in row)
+        self.moves = bytes(moves)
+        self.step_list = None
+
+    def __len__(self):
+        return len(self.moves) + 1  # Steps, the start included
+
+    def move_names(self):
+        """Moves from the start to the goal."""
+        return [MOVE_NAMES[code] for code in self.moves]
+
+    def steps(self):
+        """Yield the steps in order, building each board from the previous one."""
+        tiles = list(self.start)
+        blank = tiles.index(0)
+        cols = self.cols
+        for depth in range(len(self)):
+            if depth:
+                code = self.moves[depth - 1]
+                dr, dc = MOVE_DELTAS[code]
+                target = blank + dr * cols + dc
+                tiles[blank], tiles[target] = tiles[target], 0
+                blank = target
+            yield {
+                'move': MOVE_NAMES[self.moves[depth - 1]] if depth else None,
+                'board': [tiles[i:i + cols] for i in range(0, len(tiles), cols)],
+                'depth': depth
+            }
+
+    def __iter__(self):
+        return self.steps()
+
+    def __getitem__(self, index):
+        if self.step_list is None:
+            self.step_list = self.to_list()
+        return self.step_list[index]
+
+    def to_list(self):
+        """The full list of step dicts (the former reconstruct_path result)."""
+        return list(self.steps())
+
+    def __str__(self):
+        return ' '.join(self.move_names())
+
+
 def reconstruct_path(state):
-    """Reconstruct the solution path from goal to initial state."""
-    path = []
+    """Reconstruct the solution path from goal to initial state as a Solution."""
+    moves = bytearray()
     current = state
     
     while current.parent is not None:
-        path.append({
-            'move': current.move,
-            'board': copy.deepcopy(current.board),
-            'depth': current.depth
-        })
+        moves.append(MOVE_NAMES.index(current.move))
         current = current.parent
     
-    # Add initial state
-    path.append({
-        'move': None,
-        'board': copy.deepcopy(current.board),
-        'depth': 0
-    })
-    
-    path.reverse()
-    return path
\ No newline at end of file
+    moves.reverse()
+    return Solution(current.board, moves)
+
+
+def path_from_moves(initial_state, moves):
+    """Solution applying a sequence of move names to initial_state."""
+    return Solution(initial_state.board, [MOVE_NAMES.index(move) for move in moves])
+
+
+UNSOLVABLE_MESSAGE = 'Goal not reachable - permutation parity does not match the blank distance'
+
+
+def is_solvable(board, goal_board):
+    """
+    Parity test: every move swaps the blank with a neighbour, i.e. one transposition
+    that also moves the blank one cell. So on boards with at least two rows and
+    columns, goal_board is reachable iff the permutation taking board to goal_board
+    (blank included) has the same parity as the blank's taxicab distance to its goal
+    cell. On a single row or column tiles can never pass each other.
+    Raises:
+        ValueError if the boards differ in shape or tiles
+    """
+    rows, cols = len(goal_board), len(goal_board[0])
+    if len(board) != rows or any(len(row) != cols for row in board):
+        raise ValueError(f'Board shape does not match the {rows}x{cols} goal')
+    tiles = [value for row in board for value in row]
+    goal_tiles = [value for row in goal_board for value in row]
+    if sorted(tiles) != sorted(goal_tiles):
+        raise ValueError('Board and goal hold different tiles')
+    if rows == 1 or cols == 1:
+        return [t for t in tiles if t] == [t for t in goal_tiles if t]
+
+    goal_index = {tile: index for index, tile in enumerate(goal_tiles)}
+    permutation = [goal_index[tile] for tile in tiles]
+    transpositions = 0  # A cycle of length k is k - 1 transpositions
+    seen = [False] * len(permutation)
+    for start in range(len(permutation)):
+        if seen[start]:
+            continue
+        index = permutation[start]
+        seen[start] = True
+        while index != start:
+            seen[index] = True
+            index = permutation[index]
+            transpositions += 1
+    blank, goal_blank = tiles.index(0), goal_index[0]
+    distance = abs(blank // cols - goal_blank // cols) + abs(blank % cols - goal_blank % cols)
+    return transpositions % 2 == distance % 2
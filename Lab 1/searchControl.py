@@ -0,0 +1,65 @@
+import time
+
+CHECK_MASK = 1023  # Solvers call checkpoint() when (expansions & CHECK_MASK) == 0
+NODE_BYTES = 220  # Traced bytes per stored state in BFS/astar on 4x4 (PackedState, node, set/dict slots)
+
+
+class SearchCancelled(Exception):
+    """Raised out of a solver by SearchControl.checkpoint()."""
+    def __init__(self, reason, expanded):
+        super().__init__(f'Search stopped ({reason}) after {expanded} expansions')
+        self.reason = reason  # 'cancelled', 'deadline', 'node_budget' or 'memory'
+        self.expanded = expanded
+
+
+class SearchControl:
+    """
+    Cooperative stop and progress hook for BFS, DFS, IDDFS, astar, IDAstar and
+    ARAStar.improve (control=SearchControl(...)). The solvers call checkpoint() once every
+    CHECK_MASK + 1 expansions, by testing bits of a counter they already keep, so
+    without a control the cost is one None test per expansion.
+    A stop request surfaces as SearchCancelled raised from inside the solver loop;
+    cancel() can be called from any thread.
+
+    Args:
+        deadline: time.monotonic() value after which the search stops
+        node_budget: expansions after which the search stops
+        progress: callable receiving {'expanded': n, ...position} dicts, where the
+            position is the depth, the IDDFS depth limit or the A*/IDA* f-bound
+        progress_interval: minimum seconds between progress calls
+        memory_cap: bytes; BFS, DFS, astar and ARA* report how many states they
+            store (explored plus frontier), and the search stops once that many
+            states times node_bytes reaches the cap. This is an estimate from the
+            state count, not a measurement of the process's memory.
+        node_bytes: estimated memory per stored state
+    """
+    def __init__(self, deadline=None, node_budget=None, progress=None, progress_interval=0.5,
+                 memory_cap=None, node_bytes=NODE_BYTES):
+        self.deadline = deadline
+        self.node_budget = node_budget
+        self.memory_cap = memory_cap
+        self.node_bytes = node_bytes
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.next_progress = 0.0
+        self.cancelled = False
+        self.expanded = 0
+
+    def cancel(self):
+        self.cancelled = True
+
+    def checkpoint(self, expanded, **position):
+        """Raise SearchCancelled if the search must stop; otherwise maybe report progress."""
+        self.expanded = expanded
+        if self.cancelled:
+            raise SearchCancelled('cancelled', expanded)
+        if self.node_budget is not None and expanded >= self.node_budget:
+            raise SearchCancelled('node_budget', expanded)
+        if self.memory_cap is not None and position.get('stored', 0) * self.node_bytes >= self.memory_cap:
+            raise SearchCancelled('memory', expanded)
+        now = time.monotonic()
+        if self.deadline is not None and now >= self.deadline:
+            raise SearchCancelled('deadline', expanded)
+        if self.progress is not None and now >= self.next_progress:
+            self.next_progress = now + self.progress_interval
+            self.progress(dict(position, expanded=expanded))
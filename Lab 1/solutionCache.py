@@ -0,0 +1,175 @@
+import sqlite3
+from collections import OrderedDict
+from puzzleState import Solution
+from packedState import MOVE_NAMES, MOVE_DELTAS
+
+# Algorithms whose solutions are shortest paths (with the admissible heuristics of heuristics.py)
+OPTIMAL_ALGORITHMS = ('bfs', 'bidirectional', 'iddfs', 'astar', 'idastar', 'oracle',
+                      'numpy_bfs', 'numpy_astar')
+
+_symmetries = {}
+
+
+def board_symmetries(rows, cols):
+    """
+    Symmetries of a rows x cols board: the 8 of the square on square boards, the
+    identity, both mirrors and the half turn otherwise.
+    Returns:
+        list of (cell_map, move_map): the cell i moves to cell_map[i], and the blank
+        move with code c becomes move_map[c] (packedState.MOVE_NAMES order)
+    """
+    key = (rows, cols)
+    if key not in _symmetries:
+        symmetries = []
+        for transpose in ((False, True) if rows == cols else (False,)):
+            for flip_rows in (False, True):
+                for flip_cols in (False, True):
+                    def apply(r, c, offset):
+                        if transpose:
+                            r, c = c, r
+                        if flip_rows:
+                            r = offset * (rows - 1) - r
+                        if flip_cols:
+                            c = offset * (cols - 1) - c
+                        return r, c
+                    cell_map = tuple(r * cols + c for r, c in
+                                     (apply(i // cols, i % cols, 1) for i in range(rows * cols)))
+                    # Directions are vectors: mirror them without the offset
+                    move_map = tuple(MOVE_DELTAS.index(apply(dr, dc, 0)) for dr, dc in MOVE_DELTAS)
+                    symmetries.append((cell_map, move_map))
+        _symmetries[key] = symmetries
+    return _symmetries[key]
+
+
+def canonical_key(board, goal_board):
+    """
+    Key shared by every (start, goal) pair equivalent under a board symmetry plus a
+    relabelling of the tiles. After each symmetry the tiles are renamed 1, 2, ... in
+    the order they appear in the goal, so the goal reduces to its blank cell and the
+    start to a relabelled tile list; the smallest encoding wins.
+    Returns:
+        (key bytes, index of the symmetry that produced it)
+    """
+    rows, cols = len(goal_board), len(goal_board[0])
+    tiles = [value for row in board for value in row]
+    goal_tiles = [value for row in goal_board for value in row]
+    best = None
+    for index, (cell_map, _) in enumerate(board_symmetries(rows, cols)):
+        start, goal = [0] * len(tiles), [0] * len(tiles)
+        for cell, target in enumerate(cell_map):
+            start[target], goal[target] = tiles[cell], goal_tiles[cell]
+        label = {0: 0}
+        for tile in goal:
+            if tile:
+                label[tile] = len(label)
+        key = bytes([rows, cols, goal.index(0)] + [label[tile] for tile in start])
+        if best is None or key < best[0]:
+            best = (key, index)
+    return best
+
+
+class SolutionCache:
+    """
+    Solution cache keyed by canonical_key, so mirror images and relabelled copies of
+    a solved instance are hits too. Solutions are stored as move codes in the
+    canonical frame and mapped back through the query's symmetry on a hit.
+    Entries live in an in-memory LRU bounded by max_bytes (key plus moves), and in an
+    optional SQLite file that survives across runs and processes.
+    batch.py (--cache) and solveService.py (--cache) put it in front of their
+    solvers; the interactive main.py does not, as its menu options report traces
+    and expanded states that a cached move list cannot reproduce.
+    """
+    def __init__(self, max_bytes=1 << 26, path=None):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (moves bytes, optimal)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+            self.db.execute('CREATE TABLE IF NOT EXISTS solutions '
+                            '(key BLOB PRIMARY KEY, moves BLOB NOT NULL, optimal INTEGER NOT NULL)')
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate,
+                'entries': len(self.entries), 'bytes': self.size}
+
+    def remember(self, key, entry):
+        """Insert into the LRU and evict the least recently used entries over max_bytes."""
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= len(key) + len(old[0])
+        self.entries[key] = entry
+        self.size += len(key) + len(entry[0])
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            evicted, (moves, _) = self.entries.popitem(last=False)
+            self.size -= len(evicted) + len(moves)
+
+    def lookup(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            return entry
+        if self.db is not None:
+            row = self.db.execute('SELECT moves, optimal FROM solutions WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                entry = (bytes(row[0]), bool(row[1]))
+                self.remember(key, entry)
+                return entry
+        return None
+
+    def get(self, initial_state, goal_state, optimal=False):
+        """
+        Cached solution for the pair, or None.
+        Args:
+            optimal: only accept solutions recorded as shortest
+        Returns:
+            puzzleState.Solution
+        """
+        key, symmetry = canonical_key(initial_state.board, goal_state.board)
+        entry = self.lookup(key)
+        if entry is None or (optimal and not entry[1]):
+            self.misses += 1
+            return None
+        self.hits += 1
+        move_map = board_symmetries(len(goal_state.board), len(goal_state.board[0]))[symmetry][1]
+        inverse = [move_map.index(code) for code in range(len(MOVE_NAMES))]
+        return Solution(initial_state.board, bytes(inverse[code] for code in entry[0]))
+
+    def put(self, initial_state, goal_state, solution, optimal=True):
+        """
+        Record a solution (puzzleState.Solution). An optimal entry is never
+        replaced by a non-optimal one, nor any entry by a longer one of the same kind.
+        """
+        key, symmetry = canonical_key(initial_state.board, goal_state.board)
+        move_map = board_symmetries(len(goal_state.board), len(goal_state.board[0]))[symmetry][1]
+        moves = bytes(move_map[code] for code in solution.moves)
+        old = self.lookup(key)
+        if old is not None and (old[1] > optimal or (old[1] == optimal and len(old[0]) <= len(moves))):
+            return
+        self.remember(key, (moves, optimal))
+        if self.db is not None:
+            self.db.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?)', (key, moves, int(optimal)))
+
+    def solve(self, initial_state, goal_state, search, optimal=True):
+        """
+        Return the cached solution or run search() (any solver call returning a
+        puzzleState.Solution or None) and cache its result.
+        """
+        solution = self.get(initial_state, goal_state, optimal)
+        if solution is None:
+            solution = search()
+            if solution is not None:
+                self.put(initial_state, goal_state, solution, optimal)
+        return solution
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
@@ -0,0 +1,177 @@
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from packedState import PackedState
+from batch import run_solver
+from main import parse_shape, parse_state
+from searchControl import SearchControl, SearchCancelled
+from solutionCache import SolutionCache, OPTIMAL_ALGORITHMS
+
+# Solvers with SearchControl checkpoints
+SERVICE_ALGORITHMS = ('bfs', 'dfs', 'iddfs', 'astar', 'idastar')
+
+
+class SolveService:
+    """
+    Line-protocol solve service: every message is one JSON object per line.
+
+    Requests:
+        {"op": "solve", "id": "r1", "state": "1,2,5,3,4,0,6,7,8", "algorithm": "astar",
+         "heuristic": "auto", "size": "3x3", "goal": "0,1,...", "deadline": 5.0,
+         "node_budget": 1000000, "progress_interval": 0.5}
+            only "id" and "state" are required; deadline is in seconds from receipt
+            and includes the time spent queued
+        {"op": "cancel", "id": "r1"}
+
+    Events sent back, tagged with the request id:
+        queued, started, progress (expanded plus depth, depth_limit or f_bound),
+        and one final result whose status is solved, unsolved, cancelled, deadline,
+        node_budget or error.
+
+    Requests wait for one of `workers` slots and run on a thread pool of that size;
+    the solvers stop cooperatively at their SearchControl checkpoints. A client
+    disconnecting cancels its outstanding requests.
+    With a solutionCache.SolutionCache, repeated and symmetric instances are
+    answered at once (result with "cached": true) and solved ones are added to it;
+    the cache is only touched from the event loop thread.
+    """
+    def __init__(self, workers=2, cache=None):
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(workers)
+        self.slots = asyncio.Semaphore(workers)
+        self.cache = cache
+
+    async def handle(self, reader, writer):
+        """Serve one client connection."""
+        jobs = {}  # Request id -> SearchControl
+        tasks = set()
+
+        def send(message):
+            if not writer.is_closing():
+                writer.write((json.dumps(message) + '\n').encode())
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    send({'event': 'error', 'error': 'invalid JSON'})
+                    continue
+                op = request.get('op', 'solve')
+                if op == 'solve':
+                    task = asyncio.create_task(self.solve(request, jobs, send))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                elif op == 'cancel' and request.get('id') in jobs:
+                    jobs[request['id']].cancel()
+                else:
+                    send({'id': request.get('id'), 'event': 'error', 'error': f"unknown op or id for '{op}'"})
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for control in jobs.values():
+                control.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+
+    async def solve(self, request, jobs, send):
+        """Queue, run and report one solve request."""
+        request_id = request.get('id')
+        loop = asyncio.get_running_loop()
+        received = time.monotonic()
+        result = {'id': request_id, 'event': 'result'}
+        try:
+            if request_id is None or request_id in jobs:
+                raise ValueError('every request needs a unique id')
+            algorithm = request.get('algorithm', 'astar')
+            if algorithm not in SERVICE_ALGORITHMS:
+                raise ValueError(f"algorithm must be one of {', '.join(SERVICE_ALGORITHMS)}")
+            rows, cols = parse_shape(str(request.get('size', '3')))
+            initial = PackedState.from_board(parse_state(request['state'], rows, cols))
+            goal_input = request.get('goal') or ','.join(str(i) for i in range(rows * cols))
+            goal = PackedState.from_board(parse_state(goal_input, rows, cols))
+        except (KeyError, ValueError) as exc:
+            send(dict(result, status='error', error=str(exc)))
+            return
+        optimal = algorithm in OPTIMAL_ALGORITHMS
+        if self.cache is not None:
+            solution = self.cache.get(initial, goal, optimal)
+            if solution is not None:
+                send(dict(result, status='solved', moves=solution.move_names(), length=len(solution) - 1,
+                          expanded=0, cached=True, time=time.monotonic() - received))
+                return
+
+        deadline = request.get('deadline')
+        control = SearchControl(
+            deadline=received + deadline if deadline is not None else None,
+            node_budget=request.get('node_budget'),
+            progress=lambda position: loop.call_soon_threadsafe(
+                send, dict(position, id=request_id, event='progress')),
+            progress_interval=request.get('progress_interval', 0.5))
+        jobs[request_id] = control
+        send({'id': request_id, 'event': 'queued'})
+        started = None
+        try:
+            async with self.slots:
+                if control.cancelled:
+                    raise SearchCancelled('cancelled', 0)
+                if control.deadline is not None and time.monotonic() >= control.deadline:
+                    raise SearchCancelled('deadline', 0)
+                send({'id': request_id, 'event': 'started', 'queued_for': time.monotonic() - received})
+                started = time.perf_counter()
+                solution, expanded = await loop.run_in_executor(
+                    self.executor, run_solver, algorithm, initial, goal,
+                    request.get('heuristic', 'auto'), control)
+            if solution is None:
+                result['status'] = 'unsolved'
+            else:
+                result.update(status='solved', moves=solution.move_names(), length=len(solution) - 1)
+                if self.cache is not None:
+                    self.cache.put(initial, goal, solution, optimal)
+                    result['cached'] = False
+            result['expanded'] = expanded
+        except SearchCancelled as exc:
+            result.update(status=exc.reason, expanded=exc.expanded)
+        except Exception as exc:
+            result.update(status='error', error=str(exc))
+        finally:
+            del jobs[request_id]
+        result['time'] = time.perf_counter() - started if started is not None else 0.0
+        send(result)
+
+
+async def serve(host='127.0.0.1', port=8765, workers=2, cache=None):
+    service = SolveService(workers, cache)
+    server = await asyncio.start_server(service.handle, host, port)
+    async with server:
+        print(f'Solve service listening on {host}:{port} with {workers} workers')
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve sliding puzzle solves over a JSON line protocol')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('-w', '--workers', type=int, default=2, help='solves running at once')
+    parser.add_argument('--cache', action='store_true', help='reuse solutions of repeated and mirror-image instances')
+    parser.add_argument('--cache-file', help='SQLite file backing the solution cache across runs (implies --cache)')
+    args = parser.parse_args(argv)
+    cache = SolutionCache(path=args.cache_file) if args.cache or args.cache_file else None
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, cache))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+if __name__ == '__main__':
+    main()
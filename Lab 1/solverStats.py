@@ -0,0 +1,74 @@
+import json
+from time import perf_counter
+
+PHASES = ('open_list', 'neighbors', 'hashing', 'heuristic')
+
+
+class SolverStats:
+    """
+    Counters filled by BFS, DFS, IDDFS and astar when passed as stats=SolverStats().
+    Solvers update them once per expansion, so the cost when stats is None is one
+    test per loop.
+
+    With sample_every=N the phases of every N-th loop iteration are timed with
+    perf_counter: popping/pushing the open list, get_neighbors, hashing states and
+    checking them against the explored/frontier sets, and heuristic evaluation.
+    phase_time holds the sampled seconds; estimate() scales them to the whole run.
+    """
+    def __init__(self, sample_every=0):
+        self.sample_every = sample_every
+        self.generated = 0  # Successors produced by get_neighbors
+        self.expanded = 0
+        self.duplicates = 0  # Successors dropped as already explored or queued
+        self.frontier_peak = 0
+        self.reopened = 0  # States queued again with a smaller g (or depth in IDDFS)
+        self.pushes = 0  # Open list operations (queue, stack, A* heap or buckets)
+        self.pops = 0
+        self.iterations = 0
+        self.sampled = 0
+        self.phase_time = dict.fromkeys(PHASES, 0.0)
+
+    def sample(self):
+        """Count one loop iteration; True if its phases should be timed."""
+        self.iterations += 1
+        if self.sample_every and self.iterations % self.sample_every == 0:
+            self.sampled += 1
+            return True
+        return False
+
+    def lap(self, phase, clock):
+        """Charge the time since clock to phase; returns the new clock."""
+        now = perf_counter()
+        self.phase_time[phase] += now - clock
+        return now
+
+    def frontier(self, size):
+        if size > self.frontier_peak:
+            self.frontier_peak = size
+
+    def estimate(self):
+        """Estimated seconds per phase over the whole run (sampled time x period)."""
+        return {phase: seconds * self.sample_every for phase, seconds in self.phase_time.items()}
+
+    def as_dict(self):
+        return {
+            'generated': self.generated, 'expanded': self.expanded, 'duplicates': self.duplicates,
+            'frontier_peak': self.frontier_peak, 'reopened': self.reopened,
+            'pushes': self.pushes, 'pops': self.pops,
+            'sampled': self.sampled, 'phase_estimate': self.estimate() if self.sampled else {},
+        }
+
+    def report(self):
+        """Multi-line summary for printing."""
+        lines = [f"{name:<14}: {value}" for name, value in self.as_dict().items()
+                 if not isinstance(value, dict)]
+        total = sum(self.phase_time.values())
+        if total:
+            lines.append(f'Phase time (estimated from {self.sampled} sampled iterations):')
+            for phase, seconds in self.estimate().items():
+                lines.append(f'  {phase:<12}: {seconds:9.4f}s  {self.phase_time[phase] / total:6.1%}')
+        return '\n'.join(lines)
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.as_dict(), f, indent=2)
@@ -0,0 +1,123 @@
+import json
+
+
+class TraceSink:
+    """
+    Destination for solver trace events. Solvers only build an event dict when
+    `detailed` is set and only call count() when `counting` is set, so the
+    default sink costs one attribute test per event.
+    """
+    detailed = False
+    counting = False
+
+    def emit(self, entry):
+        """Receive one fully built trace event dict."""
+
+    def count(self, action):
+        """Receive the action name of one event."""
+
+    @property
+    def data(self):
+        """What the solver returns as trace_data."""
+        return []
+
+    def close(self):
+        pass
+
+
+class NullTrace(TraceSink):
+    """Record nothing."""
+
+
+class CounterTrace(TraceSink):
+    """Count events per action without building them."""
+    counting = True
+
+    def __init__(self):
+        self.counts = {}
+
+    def count(self, action):
+        self.counts[action] = self.counts.get(action, 0) + 1
+
+    @property
+    def data(self):
+        return [dict(self.counts, action='counters')]
+
+
+class ListTrace(TraceSink):
+    """Keep every event in a list (the solvers' original behaviour)."""
+    detailed = True
+
+    def __init__(self):
+        self.entries = []
+
+    def emit(self, entry):
+        self.entries.append(entry)
+
+    @property
+    def data(self):
+        return self.entries
+
+
+class CallbackTrace(TraceSink):
+    """Pass each event to a callback as it happens."""
+    detailed = True
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def emit(self, entry):
+        self.callback(entry)
+
+
+class GeneratorTrace(TraceSink):
+    """Send each event into a (primed) generator; close() closes the generator."""
+    detailed = True
+
+    def __init__(self, generator):
+        self.generator = generator
+        next(self.generator)
+
+    def emit(self, entry):
+        self.generator.send(entry)
+
+    def close(self):
+        self.generator.close()
+
+
+class JsonlTrace(TraceSink):
+    """Stream events to a file, one JSON object per line."""
+    detailed = True
+
+    def __init__(self, path):
+        self.file = open(path, 'w')
+
+    def emit(self, entry):
+        self.file.write(json.dumps(entry) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+def make_trace(trace):
+    """
+    Resolve a solver's trace= option to a sink.
+    Args:
+        trace: True/'list' (keep all events), None/False/'none' (nothing),
+               'counters' (per-action counts), a TraceSink, a generator or a callable
+    A sink passed in is returned as is and left open; solvers close the sinks
+    made here (closing a GeneratorTrace closes the caller's generator).
+    """
+    if isinstance(trace, TraceSink):
+        return trace
+    if trace is True or trace == 'list':
+        return ListTrace()
+    if trace is None or trace is False or trace == 'none':
+        return NullTrace()
+    if trace == 'counters':
+        return CounterTrace()
+    if hasattr(trace, 'send'):
+        return GeneratorTrace(trace)
+    if callable(trace):
+        return CallbackTrace(trace)
+    raise ValueError(f"Unknown trace option {trace!r}")
@@ -0,0 +1,156 @@
+from heuristics import moved_tile, state_tiles
+
+_tables = {}
+MAX_LINES = 4  # The tables grow combinatorially with the lines per axis: 5 lines of 5 is out of reach
+
+
+def build_walking_table(lines, width, blank_line):
+    """
+    Walking distance along one axis: a state only records, for every line (row or
+    column), how many tiles of each goal line it holds and which line has the blank.
+    A move shifts one tile between the blank's line and a neighbouring line, so a
+    BFS from the goal state gives a lower bound on the moves along that axis.
+    States are encoded as integers: count of (line, goal line) in a bit field,
+    blank line above all the counts.
+    Returns:
+        dict of encoded state -> moves
+    """
+    bits = width.bit_length()
+    blank_shift = bits * lines * lines
+
+    def encode(counts, blank):
+        code = blank << blank_shift
+        for i, count in enumerate(counts):
+            code |= count << (i * bits)
+        return code
+
+    start = [0] * (lines * lines)
+    for line in range(lines):
+        start[line * lines + line] = width - (line == blank_line)
+    table = {encode(start, blank_line): 0}
+    layer = [(start, blank_line)]
+    depth = 0
+    while layer:
+        depth += 1
+        next_layer = []
+        for counts, blank in layer:
+            for line in (blank - 1, blank + 1):
+                if not 0 <= line < lines:
+                    continue
+                for goal in range(lines):
+                    if counts[line * lines + goal]:
+                        child = counts[:]
+                        child[line * lines + goal] -= 1
+                        child[blank * lines + goal] += 1
+                        code = encode(child, line)
+                        if code not in table:
+                            table[code] = depth
+                            next_layer.append((child, line))
+        layer = next_layer
+    return table
+
+
+def walking_table(lines, width, blank_line):
+    """Cached build_walking_table."""
+    key = (lines, width, blank_line)
+    if key not in _tables:
+        _tables[key] = build_walking_table(lines, width, blank_line)
+    return _tables[key]
+
+
+class WalkingDistanceHeuristic:
+    """
+    Vertical plus horizontal walking distance. Each axis is looked up by an integer
+    code that is a sum of per-(cell, tile) weights, and a move only changes the code
+    of the axis it moves along, so updates touch one table.
+    """
+    name = 'Walking_Distance'
+    integer = True
+
+    def __init__(self, goal_board, debug=False):
+        self.rows, self.cols = len(goal_board), len(goal_board[0])
+        if max(self.rows, self.cols) > MAX_LINES:
+            raise ValueError(f'Walking distance tables are only built for boards up to '
+                             f'{MAX_LINES}x{MAX_LINES}, got {self.rows}x{self.cols}; use linear_conflict')
+        self.debug = debug
+        n = self.rows * self.cols
+        goal_positions = {}
+        for i in range(self.rows):
+            for j in range(self.cols):
+                goal_positions[goal_board[i][j]] = (i, j)
+        blank_i, blank_j = goal_positions[0]
+        self.vertical = walking_table(self.rows, self.cols, blank_i)
+        self.horizontal = walking_table(self.cols, self.rows, blank_j)
+        # Same encoding as build_walking_table, one weight per (cell, tile)
+        v_bits, h_bits = self.cols.bit_length(), self.rows.bit_length()
+        self.v_weight = [[0] * n for _ in range(n)]
+        self.h_weight = [[0] * n for _ in range(n)]
+        for index in range(n):
+            i, j = divmod(index, self.cols)
+            for tile, (goal_i, goal_j) in goal_positions.items():
+                if tile == 0:
+                    self.v_weight[index][0] = i << (v_bits * self.rows * self.rows)
+                    self.h_weight[index][0] = j << (h_bits * self.cols * self.cols)
+                else:
+                    self.v_weight[index][tile] = 1 << (v_bits * (i * self.rows + goal_i))
+                    self.h_weight[index][tile] = 1 << (h_bits * (j * self.cols + goal_j))
+
+    @staticmethod
+    def code(weight, tiles):
+        code = 0
+        for index, tile in enumerate(tiles):
+            code += weight[index][tile]
+        return code
+
+    def codes(self, tiles):
+        """(vertical, horizontal) codes of a flat row-major tile list."""
+        return self.code(self.v_weight, tiles), self.code(self.h_weight, tiles)
+
+    def evaluate_tiles(self, tiles):
+        """Full evaluation of a flat row-major tile list."""
+        v_code, h_code = self.codes(tiles)
+        return self.vertical[v_code] + self.horizontal[h_code]
+
+    def __call__(self, board):
+        return self.evaluate_tiles([value for row in board for value in row])
+
+    def update_codes(self, codes, tile, src, dst):
+        """
+        h and codes after tile slid from src to dst, from the codes before the move.
+        Only the code of the axis the tile moved along changes, by the weights of the
+        tile and the blank trading cells, so no pass over the board is needed.
+        Returns:
+            (h, codes)
+        """
+        v_code, h_code = codes
+        if src // self.cols != dst // self.cols:
+            weight = self.v_weight
+            v_code += weight[dst][tile] - weight[src][tile] + weight[src][0] - weight[dst][0]
+        else:
+            weight = self.h_weight
+            h_code += weight[dst][tile] - weight[src][tile] + weight[src][0] - weight[dst][0]
+        return self.vertical[v_code] + self.horizontal[h_code], (v_code, h_code)
+
+    def update_tiles(self, h, tiles, tile, src, dst, where=None):
+        """
+        Update h after tile slid from src to dst; tiles is the board after the move.
+        Without the codes this rescans the board; searches that keep the codes
+        alongside h use update_codes instead.
+        """
+        if src // self.cols != dst // self.cols:
+            weight, table = self.v_weight, self.vertical
+        else:
+            weight, table = self.h_weight, self.horizontal
+        after = self.code(weight, tiles)
+        before = after - weight[dst][tile] - weight[src][0] + weight[src][tile] + weight[dst][0]
+        return h - table[before] + table[after]
+
+    def child(self, parent, h, child):
+        tile, src, dst = moved_tile(parent, child)
+        tiles = state_tiles(child)
+        value = self.update_tiles(h, tiles, tile, src, dst)
+        if self.debug:
+            expected = self.evaluate_tiles(tiles)
+            if value != expected:
+                raise AssertionError(f'{self.name}: incremental value {value} != full recompute {expected}')
+        return value